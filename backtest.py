@@ -0,0 +1,179 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import portfolio
+from indicators import (
+    MACD_FAST, MACD_SLOW, MACD_SIGNAL, RSI_PERIOD, ema, wilder, rsi_from_averages,
+)
+
+# ---- BACKTEST ----
+# Long-only strategies evaluated as whole position and P&L arrays, without a
+# loop over bars. A position decided on a bar's close is held until the next
+# close, so signals never use prices they couldn't have seen. The SMA sweep
+# evaluates many window pairs at once as rows of one matrix, split into chunks
+# across a process pool.
+
+COST = 0.001  # fraction of the traded value paid on every position change
+RSI_LOWER, RSI_UPPER = 30, 70
+SWEEP_WINDOWS = range(10, 201, 10)
+CHUNK_SIZE = 128  # window pairs per worker task
+STAT_COLUMNS = ["Total return", "Annual return", "Annual volatility", "Sharpe",
+                "Max drawdown", "Trades", "Exposure"]
+
+
+def rolling_means(close, windows):
+    """Simple moving averages of close for every window, one row per window."""
+    close = np.asarray(close, dtype=float)
+    sums = np.concatenate(([0.0], np.cumsum(close)))
+    means = np.full((len(windows), len(close)), np.nan)
+    for row, window in enumerate(windows):
+        if window <= len(close):
+            means[row, window - 1:] = (sums[window:] - sums[:-window]) / window
+    return means
+
+
+def crossover_positions(close, fast=50, slow=200):
+    """Long while the fast SMA is above the slow one (golden to death cross)."""
+    fast_sma, slow_sma = rolling_means(close, [fast, slow])
+    with np.errstate(invalid="ignore"):
+        return (fast_sma > slow_sma).astype(float)
+
+
+def rsi_positions(close, period=RSI_PERIOD, lower=RSI_LOWER, upper=RSI_UPPER):
+    """Buys when RSI falls below lower, sells when it rises above upper."""
+    delta = np.diff(np.asarray(close, dtype=float), prepend=np.nan)
+    rsi = rsi_from_averages(wilder(np.clip(delta, 0, None), period),
+                            wilder(np.clip(-delta, 0, None), period))
+    # Entries and exits, held in between by forward filling
+    events = np.where(rsi < lower, 1.0, np.where(rsi > upper, 0.0, np.nan))
+    return pd.Series(events).ffill().fillna(0).to_numpy()
+
+
+def macd_positions(close, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    """Long while MACD is above its signal line."""
+    close = np.asarray(close, dtype=float)
+    macd = ema(close, fast) - ema(close, slow)
+    positions = (macd > ema(macd, signal)).astype(float)
+    positions[:slow - 1] = 0  # the slow EMA is not settled yet
+    return positions
+
+
+STRATEGIES = {
+    "SMA crossover": crossover_positions,
+    "RSI": rsi_positions,
+    "MACD": macd_positions,
+}
+
+
+def strategy_returns(close, positions, cost=COST):
+    """Per-bar returns of holding positions (last axis is time) on close.
+
+    positions[t] is held from close t to close t + 1 and trading into it costs
+    cost times the change in position. Returns one fewer bar than close.
+    """
+    close = np.asarray(close, dtype=float)
+    returns = close[1:] / close[:-1] - 1
+    positions = np.asarray(positions, dtype=float)
+    trades = np.abs(np.diff(positions, axis=-1, prepend=0))
+    return positions[..., :-1] * returns - cost * trades[..., :-1]
+
+
+def summarize(returns, positions, annualization=portfolio.TRADING_DAYS):
+    """Summary statistics of strategy returns, one row per strategy.
+
+    returns and positions are 2-D with time on the last axis, as given and
+    taken by strategy_returns.
+    """
+    returns = np.atleast_2d(returns)
+    positions = np.atleast_2d(positions)
+    n = returns.shape[-1]
+
+    equity = np.cumprod(1 + returns, axis=-1)
+    growth = equity[:, -1] if n else np.ones(len(returns))
+    volatility = returns.std(axis=-1, ddof=1) * np.sqrt(annualization)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(volatility > 0,
+                          returns.mean(axis=-1) * annualization / volatility, np.nan)
+    equity = np.concatenate((np.ones((len(returns), 1)), equity), axis=-1)
+
+    return {
+        "Total return": growth - 1,
+        "Annual return": growth ** (annualization / max(n, 1)) - 1,
+        "Annual volatility": volatility,
+        "Sharpe": sharpe,
+        "Max drawdown": portfolio.max_drawdowns(equity.T),
+        "Trades": (np.diff(positions, axis=-1, prepend=0) != 0).sum(axis=-1),
+        "Exposure": positions.mean(axis=-1),
+    }
+
+
+def run(close, strategy, interval="1d", cost=COST, **params):
+    """Backtests one strategy on a close Series.
+
+    Returns a dict with "equity", the value of 1 invested in the strategy and
+    in buy and hold on every bar, and "stats", their summary statistics.
+    """
+    values = close.to_numpy(dtype=float)
+    positions = STRATEGIES[strategy](values, **params)
+    hold = np.ones(len(values))
+
+    returns = np.vstack((strategy_returns(values, positions, cost),
+                         strategy_returns(values, hold, cost=0)))
+    stats = summarize(returns, np.vstack((positions, hold)),
+                      portfolio.periods_per_year(interval))
+
+    curves = np.concatenate((np.ones((2, 1)), np.cumprod(1 + returns, axis=-1)), axis=-1)
+    equity = pd.DataFrame({strategy: curves[0], "Buy and hold": curves[1]}, index=close.index)
+    stats = pd.DataFrame(stats, index=[strategy, "Buy and hold"])[STAT_COLUMNS]
+    return {"equity": equity, "stats": stats}
+
+
+def _sweep_chunk(close, pairs, cost, annualization):
+    # Runs in a worker process: every pair of the chunk is a row of one matrix
+    windows = sorted({w for pair in pairs for w in pair})
+    means = rolling_means(close, windows)
+    row = {w: i for i, w in enumerate(windows)}
+    fast = means[[row[f] for f, _ in pairs]]
+    slow = means[[row[s] for _, s in pairs]]
+    with np.errstate(invalid="ignore"):
+        positions = (fast > slow).astype(float)
+    return summarize(strategy_returns(close, positions, cost), positions, annualization)
+
+
+def sweep(close, windows=SWEEP_WINDOWS, interval="1d", cost=COST, workers=None):
+    """Backtests the SMA crossover for every (fast, slow) pair of windows.
+
+    Returns the summary statistics of every pair, best Sharpe ratio first.
+    """
+    values = close.to_numpy(dtype=float)
+    windows = sorted(windows)
+    pairs = [(f, s) for f in windows for s in windows if f < s]
+    if not pairs:
+        return pd.DataFrame(columns=STAT_COLUMNS)
+    chunks = [pairs[i:i + CHUNK_SIZE] for i in range(0, len(pairs), CHUNK_SIZE)]
+    annualization = portfolio.periods_per_year(interval)
+
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        results = [_sweep_chunk(values, chunk, cost, annualization) for chunk in chunks]
+    else:
+        # Spawned rather than forked: the app calls this from worker threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            results = list(executor.map(
+                _sweep_chunk,
+                [values] * len(chunks),
+                chunks,
+                [cost] * len(chunks),
+                [annualization] * len(chunks),
+            ))
+
+    stats = pd.DataFrame(
+        {column: np.concatenate([r[column] for r in results]) for column in STAT_COLUMNS},
+        index=pd.MultiIndex.from_tuples(pairs, names=["Fast", "Slow"]),
+    )
+    return stats.sort_values("Sharpe", ascending=False)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# ---- COMPACT BARS ----
+# OHLCV history in contiguous NumPy arrays: int64 epoch timestamps, float
+# prices and int64 volume. Dividends and splits are dropped. The arrays are
+# read-only, so the same Bars can be handed to every caller without copies.
+
+INTRADAY_PRICE_DTYPE = np.float32  # intraday prices don't need float64
+PRICE_DTYPE = np.float64
+
+
+def _frozen(values, dtype):
+    values = np.ascontiguousarray(values, dtype=dtype)
+    values.flags.writeable = False
+    return values
+
+
+class Bars:
+    """Immutable OHLCV bars of one series."""
+
+    __slots__ = ("times", "open", "high", "low", "close", "volume", "tz", "_index")
+
+    def __init__(self, times, open, high, low, close, volume, tz=None):
+        self.times = _frozen(times, np.int64)  # epoch nanoseconds (UTC)
+        price_dtype = close.dtype if np.issubdtype(close.dtype, np.floating) else PRICE_DTYPE
+        self.open = _frozen(open, price_dtype)
+        self.high = _frozen(high, price_dtype)
+        self.low = _frozen(low, price_dtype)
+        self.close = _frozen(close, price_dtype)
+        self.volume = _frozen(volume, np.int64)
+        self.tz = tz
+        self._index = None
+
+    @classmethod
+    def from_frame(cls, df, price_dtype=PRICE_DTYPE):
+        index = df.index
+        if isinstance(index, pd.DatetimeIndex):
+            times = index.as_unit("ns").asi8
+        else:
+            times = np.arange(len(df))
+        volume = df["Volume"].to_numpy() if "Volume" in df.columns else np.zeros(len(df))
+        return cls(
+            times,
+            df["Open"].to_numpy(dtype=price_dtype),
+            df["High"].to_numpy(dtype=price_dtype),
+            df["Low"].to_numpy(dtype=price_dtype),
+            df["Close"].to_numpy(dtype=price_dtype),
+            np.nan_to_num(volume.astype(np.float64)).astype(np.int64),
+            tz=getattr(index, "tz", None),
+        )
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, item):
+        """Bars of a slice, sharing memory with these ones."""
+        if not isinstance(item, slice):
+            raise TypeError("Bars can only be sliced")
+        return Bars(self.times[item], self.open[item], self.high[item],
+                    self.low[item], self.close[item], self.volume[item], tz=self.tz)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in [self.times, self.open, self.high,
+                                      self.low, self.close, self.volume])
+
+    @property
+    def index(self):
+        # Built once, the timestamps are the only data copied for pandas
+        if self._index is None:
+            index = pd.DatetimeIndex(self.times.view("M8[ns]"))
+            if self.tz is not None:
+                index = index.tz_localize("UTC").tz_convert(self.tz)
+            self._index = index
+        return self._index
+
+    def to_frame(self):
+        """History frame whose columns are views on the arrays."""
+        return pd.DataFrame(
+            {
+                "Open": self.open,
+                "High": self.high,
+                "Low": self.low,
+                "Close": self.close,
+                "Volume": self.volume,
+            },
+            index=self.index,
+            copy=False,
+        )
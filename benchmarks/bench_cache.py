@@ -0,0 +1,94 @@
+"""Cache benchmark: hit latency of st.cache_data against the shared cache.
+
+st.cache_data pickles a return value once and unpickles a fresh copy on every
+hit. The shared cache (cache.cached) hands out the stored object instead, a
+shallow copy for frames. Both wrap the same function returning a history
+frame of n one-minute bars, or a ticker info dict, and only hits are timed.
+
+Run from the repository root:
+
+    python benchmarks/bench_cache.py
+    python benchmarks/bench_cache.py --sizes 10000 1000000
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+import streamlit.logger  # noqa: E402
+
+from cache import TTLCache, cached  # noqa: E402
+from synthetic import INFO  # noqa: E402
+from bench_hot_paths import minutes, best_time  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def cases(n):
+    """(name, st.cache_data function, cached function) for n bars."""
+    frame = minutes(n)
+    cache = TTLCache()
+
+    @st.cache_data(ttl=3600, show_spinner=False)
+    def data_history(n):
+        return frame
+
+    @cached(3600, cache=cache)
+    def shared_history(n):
+        return frame
+
+    return [("history frame", data_history, shared_history)]
+
+
+def info_cases():
+    cache = TTLCache()
+
+    @st.cache_data(ttl=3600, show_spinner=False)
+    def data_info(ticker):
+        return dict(INFO)
+
+    @cached(3600, cache=cache)
+    def shared_info(ticker):
+        return dict(INFO)
+
+    return [("info dict", data_info, shared_info)]
+
+
+def measure(name, n, data, shared):
+    # The first calls are the misses, only hits are timed
+    data(n)
+    shared(n)
+    return {
+        "case": name,
+        "bars": n,
+        "cache_data": best_time(lambda: data(n)),
+        "shared": best_time(lambda: shared(n)),
+    }
+
+
+def report(results):
+    print(f"{'case':<16} {'bars':>9} {'cache_data (ms)':>16} {'shared (ms)':>12} {'speedup':>8}")
+    for r in results:
+        bars = "" if r["bars"] is None else r["bars"]
+        print(f"{r['case']:<16} {bars:>9} {r['cache_data'] * 1e3:16.3f} "
+              f"{r['shared'] * 1e3:12.3f} {r['cache_data'] / r['shared']:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="bar counts")
+    args = parser.parse_args()
+    # Without a running app Streamlit warns about its in-memory cache storage
+    streamlit.logger.set_log_level("error")
+
+    results = [measure(name, None, data, shared) for name, data, shared in info_cases()]
+    for n in args.sizes:
+        results += [measure(name, n, data, shared) for name, data, shared in cases(n)]
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
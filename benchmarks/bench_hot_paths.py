@@ -0,0 +1,217 @@
+"""Benchmarks of the dashboard's hot paths on synthetic OHLCV data.
+
+Times the chart builders, the table helpers and the cached fetchers (hit and
+miss: bars, history, snapshot, info and tables) from 100 to 1M bars, and reports the best time, the peak memory
+allocated and the size of the serialized figure.
+
+Run from the repository root:
+
+    python benchmarks/bench_hot_paths.py --save     # record benchmarks/baseline.json
+    python benchmarks/bench_hot_paths.py            # compare against it
+
+The comparison fails (exit status 1) when a chart takes more than
+--tolerance times its baseline time.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store  # noqa: E402
+import sources  # noqa: E402
+import functions  # noqa: E402
+from synthetic import INFO, SyntheticSource, ohlcv  # noqa: E402
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+N_TICKERS = 10
+INDICATORS = ["SMA_20", "SMA_50", "SMA_200", "EMA_20", "EMA_50", "EMA_200",
+              "MACD", "RSI", "Crossover_50/200"]
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = 1.5  # allowed slowdown of a chart against the baseline
+REPEAT = 5
+TIME_BUDGET = 2.0  # seconds of repeats per case at most
+END = pd.Timestamp("2025-01-02 16:00", tz="America/New_York")
+
+
+def minutes(n, seed=0):
+    """n one-minute bars of a random walk up to END."""
+    return ohlcv(n, seed, end=END, volatility=0.001)
+
+
+# The table top_table formats, prices and changes in one column
+TOP_MOVERS = pd.DataFrame({
+    "Symbol": [f"SYM{i}" for i in range(10)],
+    "LTP": [f"{100 + i:.2f} +{i / 10:.2f}%" for i in range(10)],
+})
+TABLE_URL = "https://example.com/top-gainers"
+
+
+def best_time(func, repeat=REPEAT):
+    times = []
+    deadline = time.perf_counter() + TIME_BUDGET
+    while len(times) < repeat:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() > deadline:
+            break
+    return min(times)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name, n, func, setup=None):
+    def run():
+        if setup is not None:
+            setup()
+        return func()
+
+    result = run()
+    return {
+        "case": name,
+        "bars": n,
+        "seconds": best_time(run),
+        "peak_mb": peak_memory(run) / 2 ** 20,
+        "json_kb": len(result.to_json()) / 2 ** 10 if hasattr(result, "to_json") and name.startswith("plot") else None,
+    }
+
+
+def chart_cases(n):
+    df = minutes(n)
+    full = functions.add_indicators(df, INDICATORS)
+    pct = functions.compare_tickers(
+        {f"T{i}": functions.Bars.from_frame(minutes(n, seed=i)) for i in range(N_TICKERS)},
+        interval="1m",
+    )
+    return [
+        measure("add_indicators", n, lambda: functions.add_indicators(df, INDICATORS)),
+        measure("plot_candles_stick_bar", n,
+                lambda: functions.plot_candles_stick_bar(full, "Synthetic", "INR")),
+        measure("plot_line_multiple", n, lambda: functions.plot_line_multiple(pct)),
+        measure("plot_gauge", n, lambda: functions.plot_gauge(pct, "T0")),
+    ]
+
+
+def fetch_cases(n, folder):
+    hist = minutes(n)
+    previous = sources.use(SyntheticSource(lambda ticker: hist, lambda ticker: INFO))
+    store.STORE_DIR = folder
+    args = ("SYNTH", "max", "1m")
+    tickers = [f"T{i}" for i in range(N_TICKERS)]
+
+    def miss():
+        functions.fetch_bars.clear(*args)
+        shutil.rmtree(folder, ignore_errors=True)
+
+    try:
+        return [
+            measure("fetch_bars miss", n, lambda: functions.fetch_bars(*args), setup=miss),
+            measure("fetch_bars hit", n, lambda: functions.fetch_bars(*args)),
+            measure("fetch_history hit", n, lambda: functions.fetch_history(*args)),
+            measure("fetch_snapshot miss", n, lambda: functions.fetch_snapshot(tickers),
+                    setup=lambda: functions.fetch_snapshot.clear(tickers)),
+            measure("fetch_snapshot hit", n, lambda: functions.fetch_snapshot(tickers)),
+        ]
+    finally:
+        sources.use(previous)
+
+
+def lookup_cases():
+    previous = sources.use(SyntheticSource(lambda ticker: minutes(1), lambda ticker: INFO))
+    try:
+        return [
+            measure("fetch_info miss", None, lambda: functions.fetch_info("SYNTH"),
+                    setup=lambda: functions.fetch_info.clear("SYNTH")),
+            measure("fetch_info hit", None, lambda: functions.fetch_info("SYNTH")),
+            measure("fetch_table miss", None, lambda: functions.fetch_table(TABLE_URL),
+                    setup=lambda: functions.fetch_table.clear(TABLE_URL)),
+            measure("fetch_table hit", None, lambda: functions.fetch_table(TABLE_URL)),
+        ]
+    finally:
+        sources.use(previous)
+
+
+def table_cases():
+    values = list(TOP_MOVERS["LTP"]) * 100
+    return [
+        measure("info_table", None, lambda: functions.info_table(INFO)),
+        measure("top_table", None, lambda: functions.top_table(TOP_MOVERS)),
+        measure("format_value x1000", None, lambda: [functions.format_value(v) for v in values]),
+    ]
+
+
+def compare(results, baseline, tolerance):
+    """Chart cases slower than tolerance times their baseline."""
+    previous = {(r["case"], r["bars"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get((r["case"], r["bars"]))
+        if old is None or not r["case"].startswith("plot"):
+            continue
+        r["baseline"] = old["seconds"]
+        if r["seconds"] > tolerance * old["seconds"]:
+            regressions.append(r)
+    return regressions
+
+
+def report(results):
+    print(f"{'case':<24} {'bars':>9} {'time (ms)':>11} {'baseline':>10} {'peak (MB)':>10} {'json (KB)':>10}")
+    for r in results:
+        bars = "" if r["bars"] is None else r["bars"]
+        baseline = f"{r['baseline'] * 1e3:10.2f}" if r.get("baseline") else f"{'':>10}"
+        json_kb = f"{r['json_kb']:10.1f}" if r["json_kb"] is not None else f"{'':>10}"
+        print(f"{r['case']:<24} {bars:>9} {r['seconds'] * 1e3:11.2f} {baseline} {r['peak_mb']:10.1f} {json_kb}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="bar counts")
+    parser.add_argument("--save", action="store_true", help="save the results as the baseline")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    results = table_cases() + lookup_cases()
+    folder = tempfile.mkdtemp(prefix="bench-store-")
+    try:
+        for n in args.sizes:
+            results += chart_cases(n)
+            results += fetch_cases(n, folder)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    regressions = []
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    report(results)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        for r in regressions:
+            print(f"REGRESSION {r['case']} ({r['bars']} bars): "
+                  f"{r['seconds'] * 1e3:.2f} ms vs {r['baseline'] * 1e3:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Scaling benchmark of the portfolio analytics.
+
+Run from the repository root: python benchmarks/bench_portfolio.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import portfolio  # noqa: E402
+
+TICKERS = [1, 2, 5, 10]
+YEARS = [1, 5, 10]
+REPEAT = 20
+
+
+def price_matrix(n_tickers, n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2000-01-03", periods=n_bars)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.01, (n_bars, n_tickers + 1)), axis=0)
+    prices = pd.DataFrame(values, index=index)
+    return prices.iloc[:, :-1].rename(columns=lambda i: f"T{i}"), prices.iloc[:, -1]
+
+
+def best_of(func, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(f"{'tickers':>8} {'years':>6} {'bars':>7} {'analyze (ms)':>13}")
+    for n_tickers in TICKERS:
+        for years in YEARS:
+            n_bars = years * portfolio.TRADING_DAYS
+            prices, benchmark = price_matrix(n_tickers, n_bars)
+            seconds = best_of(lambda: portfolio.analyze(prices, benchmark=benchmark))
+            print(f"{n_tickers:>8} {years:>6} {n_bars:>7} {seconds * 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Startup benchmark: cold import time and time to first render.
+
+Every measurement runs in a fresh interpreter, so nothing is imported yet:
+- import: `import functions`, which every run of the page goes through,
+- render: a first run of views/Page_price.py with Streamlit's AppTest, fed
+  with synthetic data recorded beforehand and replayed by a ReplaySource, so
+  the network is never involved.
+
+The best of --repeat runs is checked against a budget. The benchmark fails
+(exit status 1) when either one goes over its budget, or when one of the
+dependencies that are meant to load lazily is loaded by the import.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --import-budget 1.5 --render-budget 4
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import store  # noqa: E402
+import sources  # noqa: E402
+from synthetic import SyntheticSource, daily  # noqa: E402
+
+IMPORT_BUDGET = 2.0  # seconds
+RENDER_BUDGET = 5.0  # seconds
+REPEAT = 3
+BARS = 400
+PAGE = os.path.join(ROOT, "views", "Page_price.py")
+
+# Imported at their point of use only, never by `import functions`
+LAZY = ["yfinance", "fp", "smtplib", "email.mime", "streamlit_javascript"]
+
+IMPORT_SCRIPT = """
+import sys, json, time
+start = time.perf_counter()
+import functions
+seconds = time.perf_counter() - start
+loaded = [m for m in {lazy!r} if m in sys.modules]
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+RENDER_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from zoneinfo import ZoneInfo
+from streamlit.testing.v1 import AppTest
+import store
+store.STORE_DIR = {store_dir!r}
+at = AppTest.from_file({page!r}, default_timeout=120)
+at.session_state["timezone"] = ZoneInfo("UTC")  # what the browser would report
+at.run()
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "exceptions": [e.message for e in at.exception]}}))
+"""
+
+def record(recordings, store_dir):
+    """Runs the page once in this process, recording what it fetches."""
+    from zoneinfo import ZoneInfo
+    from streamlit.testing.v1 import AppTest
+
+    previous = sources.use(sources.RecordingSource(SyntheticSource(partial(daily, n=BARS)), recordings))
+    store.STORE_DIR = store_dir
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        at = AppTest.from_file(PAGE, default_timeout=120)
+        at.session_state["timezone"] = ZoneInfo("UTC")
+        at.run()
+    finally:
+        os.chdir(cwd)
+        sources.use(previous)
+
+
+def run_script(script, env):
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    # The result is the last line, Streamlit may log before it
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def best(script, env, repeat):
+    runs = [run_script(script, env) for _ in range(repeat)]
+    return min(runs, key=lambda r: r["seconds"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="seconds")
+    parser.add_argument("--render-budget", type=float, default=RENDER_BUDGET, help="seconds")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench-startup-")
+    recordings = os.path.join(folder, "recordings")
+    try:
+        record(recordings, os.path.join(folder, "recorded-store"))
+
+        env = dict(os.environ, PYTHONPATH=ROOT, DATA_SOURCE="replay", RECORDINGS_DIR=recordings)
+        env.pop("METRICS", None)
+        imported = best(IMPORT_SCRIPT.format(lazy=LAZY), env, args.repeat)
+        # A fresh on-disk store for every run, so the first render stays cold
+        renders = [
+            run_script(RENDER_SCRIPT.format(store_dir=os.path.join(folder, f"store-{i}"), page=PAGE), env)
+            for i in range(args.repeat)
+        ]
+        rendered = min(renders, key=lambda r: r["seconds"])
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    print(f"{'measure':<14} {'time (s)':>9} {'budget (s)':>11}")
+    print(f"{'import':<14} {imported['seconds']:9.3f} {args.import_budget:11.3f}")
+    print(f"{'first render':<14} {rendered['seconds']:9.3f} {args.render_budget:11.3f}")
+
+    failures = []
+    if imported["seconds"] > args.import_budget:
+        failures.append(f"import took {imported['seconds']:.3f} s, budget {args.import_budget:.3f} s")
+    if imported["loaded"]:
+        failures.append(f"import loaded {', '.join(imported['loaded'])}")
+    if rendered["seconds"] > args.render_budget:
+        failures.append(f"first render took {rendered['seconds']:.3f} s, budget {args.render_budget:.3f} s")
+    if rendered["exceptions"]:
+        failures.append(f"first render raised: {rendered['exceptions'][0]}")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import time
+import pickle
+import inspect
+import functools
+import itertools
+import threading
+from types import MappingProxyType
+from collections import OrderedDict, Counter
+from collections.abc import Mapping
+
+import numpy as np
+
+import pandas as pd
+
+# ---- MARKET-DATA CACHE ----
+# One in-process cache shared by every session. Entries expire after a TTL
+# chosen per data type, the least recently used ones are evicted once the
+# memory budget is exceeded, and keys can be invalidated one by one.
+
+MAX_BYTES = 512 * 1024 ** 2  # memory budget for all entries
+ERROR_TTL = 30  # seconds a failed fetch is remembered before it is retried
+REFRESH_MIN_AGE = 60  # entries younger than this survive a "Refresh data"
+FIGURE_BYTES = 64 * 1024 ** 2  # memory budget for built figures
+FIGURE_TTL = 3600
+
+# Every entry stored gets the next number, so a version identifies one
+# entry of one cache for good, even after it is replaced or evicted
+_versions = itertools.count(1)
+
+
+def sizeof(value):
+    """Approximate memory used by a cached value, in bytes."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, "nbytes"):
+        # NumPy arrays, array containers such as bars.Bars and built figures
+        return int(value.nbytes)
+    if isinstance(value, Mapping):
+        return sum(sizeof(v) for v in value.values()) + 64 * len(value)
+    try:
+        return len(pickle.dumps(value))
+    except Exception:
+        return 1024
+
+
+def readonly(value):
+    """Write-protects a value before it is shared between sessions.
+
+    Entries are handed out without copying their data, so dicts become
+    read-only mappings and arrays read-only arrays. Bars are immutable already,
+    frames and series are guarded by handout.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: readonly(v) for k, v in value.items()})
+    if isinstance(value, tuple):
+        return tuple(readonly(v) for v in value)
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    return value
+
+
+def handout(value):
+    """What a caller gets for a cached value: frames and series are shallow
+    copies, which share the entry's data until written to (pandas >= 3 always
+    copies on write), so a session setting cells or columns never changes the
+    entry."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, MappingProxyType):
+        return MappingProxyType({k: handout(v) for k, v in value.items()})
+    if isinstance(value, tuple):
+        return tuple(handout(v) for v in value)
+    return value
+
+
+class TTLCache:
+    """Thread-safe cache with per-entry TTL and LRU eviction by memory budget."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+        self._entries = OrderedDict()  # key -> (value, stored_at, expires_at, size, version)
+        self._lock = threading.Lock()
+
+    def get(self, key, count=True):
+        """Returns (True, value) for a live entry, (False, None) otherwise.
+
+        count=False leaves the hit and miss counters alone, for a second look
+        at a key whose lookup was already counted.
+        """
+        return self.lookup(key, count)[:2]
+
+    def lookup(self, key, count=True):
+        """Returns (True, value, version) for a live entry, (False, None, None) otherwise."""
+        name = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > time.monotonic():
+                self._entries.move_to_end(key)
+                if count:
+                    self.hits[name] += 1
+                return True, entry[0], entry[4]
+            if entry is not None:
+                self._remove(key)
+            if count:
+                self.misses[name] += 1
+            return False, None, None
+
+    def set(self, key, value, ttl):
+        """Stores value for ttl seconds, returns the entry's version (None
+        when the value is larger than the whole budget and isn't stored)."""
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            version = next(_versions)
+            self._entries[key] = (value, now, now + ttl, size, version)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self.evictions[oldest[0]] += 1
+                self._remove(oldest)
+        return version
+
+    def expires_in(self, key):
+        """Seconds until key expires, None if it isn't cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry[2] - time.monotonic()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.nbytes -= entry[3]
+
+    def invalidate(self, key=None, prefix=()):
+        """Drops one key, or every key starting with prefix."""
+        with self._lock:
+            if key is not None:
+                if key in self._entries:
+                    self._remove(key)
+                return
+            for k in [k for k in self._entries if k[:len(prefix)] == prefix]:
+                self._remove(k)
+
+    def refresh(self, min_age=REFRESH_MIN_AGE, prefix=(), key=None):
+        """Drops expired entries and those stored more than min_age seconds ago.
+
+        Only key if given, else every key starting with prefix.
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys = [key] if key is not None else [k for k in self._entries if k[:len(prefix)] == prefix]
+            for k in keys:
+                entry = self._entries.get(k)
+                if entry is not None and (entry[2] <= now or now - entry[1] > min_age):
+                    self._remove(k)
+
+    def stats(self):
+        with self._lock:
+            names = set(self.hits) | set(self.misses) | {k[0] for k in self._entries}
+            return {
+                name: {
+                    "hits": self.hits[name],
+                    "misses": self.misses[name],
+                    "evictions": self.evictions[name],
+                    "entries": sum(1 for k in self._entries if k[0] == name),
+                }
+                for name in sorted(names)
+            }
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one in-flight call."""
+
+    def __init__(self):
+        self.shared = Counter()  # calls served by another caller's fetch
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared[key[0]] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+market_cache = TTLCache()
+figure_cache = TTLCache(max_bytes=FIGURE_BYTES)
+flights = SingleFlight()
+
+
+def freeze(value):
+    # Make call arguments hashable, e.g. a list of tickers
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    return value
+
+
+def cached(ttl, cache=market_cache, flight=flights):
+    """Caches a fetcher in the shared cache.
+
+    ttl is a number of seconds or a function taking the fetcher's arguments
+    and returning one. Hits return the cached object (write-protected with
+    readonly and handed out with handout), never a copy of its data. Returned exceptions are only kept for ERROR_TTL.
+    Concurrent misses on the same key wait for a single upstream call. The
+    wrapper gets clear(*args, **kwargs) to drop one call (or all calls when
+    given no arguments), refresh(*args, **kwargs) to drop one call (or all
+    calls when given no arguments) unless it is younger than min_age, and
+    warm(within, *args, **kwargs) to refetch a call in place when it is
+    missing or expires within that many seconds, and versioned(*args,
+    **kwargs) returning (value, version), where version identifies the cache
+    entry the value comes from, e.g. to key what is built from it.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = func.__name__
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (name,) + tuple(freeze(v) for v in bound.arguments.values())
+
+        def fetch(key, args, kwargs):
+            value = readonly(func(*args, **kwargs))
+            if isinstance(value, Exception):
+                seconds = ERROR_TTL
+            else:
+                seconds = ttl(*args, **kwargs) if callable(ttl) else ttl
+            # Stored before the waiting callers are released
+            return value, cache.set(key, value, seconds)
+
+        def load(key, args, kwargs):
+            # A caller that missed just as the previous flight finished finds
+            # its result here instead of starting another upstream call
+            found, value, version = cache.lookup(key, count=False)
+            if found:
+                return value, version
+            return fetch(key, args, kwargs)
+
+        def versioned(*args, **kwargs):
+            key = make_key(args, kwargs)
+            found, value, version = cache.lookup(key)
+            if not found:
+                value, version = flight.do(key, lambda: load(key, args, kwargs))
+            return handout(value), version
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return versioned(*args, **kwargs)[0]
+
+        def warm(within, *args, **kwargs):
+            # The old entry keeps being served until the new one replaces it
+            key = make_key(args, kwargs)
+            remaining = cache.expires_in(key)
+            if remaining is None or remaining < within:
+                flight.do(key, lambda: fetch(key, args, kwargs))
+
+        def clear(*args, **kwargs):
+            if args or kwargs:
+                cache.invalidate(make_key(args, kwargs))
+            else:
+                cache.invalidate(prefix=(name,))
+
+        def refresh(*args, min_age=REFRESH_MIN_AGE, **kwargs):
+            if args or kwargs:
+                cache.refresh(min_age, key=make_key(args, kwargs))
+            else:
+                cache.refresh(min_age, prefix=(name,))
+
+        wrapper.clear = clear
+        wrapper.refresh = refresh
+        wrapper.warm = warm
+        wrapper.versioned = versioned
+        return wrapper
+
+    return decorator
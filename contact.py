@@ -1,9 +1,6 @@
 import streamlit as st
 import re
 import time
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import json
 
 def is_valid_email(email):
@@ -64,6 +61,11 @@ def contact_form():
             subject = 'yfinance App'
             body = json.dumps(data, indent=4)
 
+            # The mail stack is only loaded once a message is sent
+            import smtplib
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+
             # Create a multipart email
             msg = MIMEMultipart()
             msg['From'] = sender_email
@@ -1,33 +1,108 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
+import numpy as np
 import datetime
-import requests
+import io
+import json
 import random
-from fp.fp import FreeProxy
-
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.colors as pc
-
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import store
+import portfolio
+import backtest
+from bars import Bars, PRICE_DTYPE, INTRADAY_PRICE_DTYPE
+from cache import cached, figure_cache, freeze, FIGURE_TTL
+from proxies import proxy_pool, is_proxy_failure
+from prefetch import Prefetcher, OPEN_INTERVAL, CLOSED_INTERVAL, seconds_until_open
+from live import LiveFeed, LIVE_CAPACITY, poll_interval
+import transport
+import sources
+from symbols import symbol_master
+import metrics
+from metrics import timed
+from indicators import add_indicators, crossover_points
+
+@timed()
 def get_proxy_dict(probability=0.5):
-    if random.random() < probability:
-        proxy = FreeProxy(rand=True).get()
-        proxies_dict = {
-            "http": proxy
-        }
-        return proxies_dict
-    else:
+    # Proxies come from the background pool, a direct connection is used
+    # while it is still empty
+    if not sources.current().uses_proxies:
         return None
+    if random.random() < probability:
+        proxy = proxy_pool.acquire()
+        if proxy is not None:
+            return proxy.proxies
+    return None
+
+def report_proxy(proxies_dict, error=None, latency=None):
+    # Only connection failures count against a proxy, errors such as an
+    # unknown ticker neither credit nor eject it
+    if proxies_dict is None:
+        return
+    if error is None:
+        proxy_pool.report(proxies_dict["http"], ok=True, latency=latency)
+    elif is_proxy_failure(error):
+        proxy_pool.report(proxies_dict["http"], ok=False)
+
+def is_retryable_via_proxy(error):
+    # A proxy that fails is dropped rather than tried again
+    return transport.is_retryable(error) and not is_proxy_failure(error)
+
+def call_yahoo(func, *args, **kwargs):
+    # func(*args, proxy=..., **kwargs) through a proxy of the pool, or
+    # directly while it is empty. A failed proxy is ejected at once and the
+    # call made again directly, so the proxy's failure is never the result
+    # (and never cached).
+    proxy = get_proxy_dict()
+    if proxy is not None:
+        try:
+            result = transport.call(transport.YAHOO_HOST, func, *args, proxy=proxy,
+                                    retryable=is_retryable_via_proxy, **kwargs)
+        except Exception as e:
+            report_proxy(proxy, error=e)
+            if not is_proxy_failure(e):
+                raise
+        else:
+            report_proxy(proxy)
+            return result
+    return transport.call(transport.YAHOO_HOST, func, *args, proxy=None, **kwargs)
+
+# ---- CACHE TTLs (seconds) ----
+INFO_TTL = 6 * 3600
+QUOTES_TTL = 60
+SPLITS_TTL = 24 * 3600
+TABLE_TTL = 5 * 60
+
+
+def is_intraday(interval):
+    return interval.endswith("m") or interval.endswith("h")
+
+
+def history_ttl(ticker=None, period="3mo", interval="1d", start=None):
+    # The finer the bars, the sooner a new one comes in
+    if is_intraday(interval):
+        return 60
+    if interval == "1d":
+        return 15 * 60
+    return 3600
+
+
+def batch_ttl(tickers=None, period="3mo", interval="1d", start=None):
+    return history_ttl(period=period, interval=interval)
+
+def portfolio_ttl(tickers=None, weights=None, benchmark=None, period="1y", interval="1d", start=None):
+    return history_ttl(period=period, interval=interval)
 
-@st.cache_data
+def backtest_ttl(ticker=None, strategy=None, period="1y", interval="1d", start=None):
+    return history_ttl(period=period, interval=interval)
+
+@cached(INFO_TTL)
+@timed()
 def fetch_info(ticker):
-    proxy = get_proxy_dict()
     # yf.set_config(proxy=proxy)
-    ticker = yf.Ticker(ticker, proxy=proxy)
     try:
-        info = ticker.info
-        return info
+        return call_yahoo(sources.current().info, ticker)
         # if "quoteType" in ticker.info:
         #     return info
         # else:
@@ -35,46 +110,382 @@ def fetch_info(ticker):
     except Exception as e:
         return e
 
-@st.cache_data
-def fetch_history(ticker, period="3mo", interval="1d", start=None):
-    proxy = get_proxy_dict()
-    ticker = yf.Ticker(ticker, proxy=proxy)
+@timed()
+def _download_history(ticker, period="3mo", interval="1d", start=None):
+    return call_yahoo(sources.current().history, ticker, period=period, interval=interval, start=start)
+
+@cached(history_ttl)
+@timed()
+def fetch_bars(ticker, period="3mo", interval="1d", start=None):
+    # Cached as compact, read-only arrays rather than the full history frame
     try:
         if start:
-            hist = ticker.history(
-                start=start,
-                interval=interval
-            )
+            hist = _download_history(ticker, interval=interval, start=start)
         else:
-            hist = ticker.history(
-                period=period,
-                interval=interval
+            # Served from the on-disk store, only the new bars are downloaded
+            hist = store.load_history(
+                ticker, period, interval,
+                lambda **kwargs: _download_history(ticker, interval=interval, **kwargs)
             )
 
-        return hist
+        price_dtype = INTRADAY_PRICE_DTYPE if is_intraday(interval) else PRICE_DTYPE
+        bars = Bars.from_frame(hist, price_dtype=price_dtype)
+        metrics.observe_size("fetch_bars", bars.nbytes)
+        return bars
 
     except Exception as e:
         return e
 
-@st.cache_data
+def fetch_history(ticker, period="3mo", interval="1d", start=None):
+    bars = fetch_bars(ticker, period=period, interval=interval, start=start)
+    if isinstance(bars, Exception):
+        return bars
+    return bars.to_frame()
+
+# ---- BATCH FETCH ----
+MAX_WORKERS = 8  # upper bound on concurrent info requests
+
+
+def _split_download(data, tickers):
+    # yf.download returns one frame with (Ticker, Price) columns, split it into
+    # compact bars per ticker
+    result = {}
+    for ticker in tickers:
+        try:
+            if isinstance(data.columns, pd.MultiIndex):
+                hist = data[ticker]
+            else:
+                hist = data
+            hist = hist.dropna(how="all")
+            if hist.empty:
+                raise ValueError(f"{ticker}: no price data found")
+            result[ticker] = Bars.from_frame(hist)
+        except Exception as e:
+            result[ticker] = e
+    return result
+
+
+@timed()
+def _download_batch(tickers, period="3mo", interval="1d", start=None):
+    # One bulk download through one proxy, Bars or an exception per ticker
+    try:
+        data = call_yahoo(sources.current().download, tickers, period=period, interval=interval, start=start)
+        histories = _split_download(data, tickers)
+    except Exception as e:
+        histories = {ticker: e for ticker in tickers}
+    return histories
+
+
+@timed()
+def fetch_infos(tickers):
+    # The info of every ticker at once on a bounded pool, so the wait is the
+    # slowest ticker rather than the sum
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(tickers))) as executor:
+        return dict(zip(tickers, executor.map(fetch_info, tickers)))
+
+@cached(batch_ttl)
+@timed()
+def fetch_histories(tickers, period="3mo", interval="1d", start=None):
+    # The bulk download alone, for the callers that only need the histories
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    return _download_batch(tickers, period=period, interval=interval, start=start)
+
+@cached(batch_ttl)
+@timed()
+def fetch_batch(tickers, period="3mo", interval="1d", start=None):
+    # One bulk download for the history and a bounded thread pool for the
+    # info (yfinance has no bulk endpoint for it), which is cached per ticker.
+    # Errors are returned per ticker so a bad symbol doesn't fail the others.
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+
+    infos = fetch_infos(tickers)
+    histories = fetch_histories(tickers, period=period, interval=interval, start=start)
+
+    return {ticker: {"info": infos[ticker], "history": histories[ticker]} for ticker in tickers}
+
+# ---- SNAPSHOT ----
+INDICES = ["^GSPC", "^DJI", "^IXIC", "^N225", "^GDAXI", "^NSEI"]  # Add NSEI
+INDICES_NAMES = [
+    "S&P 500",
+    "Dow Jones",
+    "NASDAQ",
+    "Nikkei 225",
+    "DAX",
+    "NIFTY 50",
+]
+
+def snapshot_ttl(tickers=None, period="1y", interval="1d"):
+    # Quotes move while one of the markets is open. Once they have all closed
+    # the snapshot holds until the first of them opens again, so reruns over
+    # a weekend don't download it again.
+    return max(QUOTES_TTL, min((seconds_until_open(ticker) for ticker in tickers), default=0))
+
+def snapshot_basket(ticker):
+    # The tickers the main page downloads together for a security
+    return list(dict.fromkeys(INDICES + [ticker]))
+
+@cached(snapshot_ttl)
+@timed()
+def fetch_snapshot(tickers, period="1y", interval="1d"):
+    # Daily bars of everything the main page shows (the index basket and the
+    # security) in one download. The sections all read the same cached call.
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    return _download_batch(tickers, period=period, interval=interval)
+
+@timed()
+def quotes(snapshot, tickers=None):
+    """Last price and change since the previous close of the tickers of a snapshot."""
+    rows = {}
+    for ticker in tickers or list(snapshot):
+        bars = snapshot.get(ticker)
+        if bars is None or isinstance(bars, Exception) or len(bars) < 2:
+            continue
+        last, previous = float(bars.close[-1]), float(bars.close[-2])
+        rows[ticker] = {
+            "Price": last,
+            "Change": last - previous,
+            "Change (%)": (last / previous - 1) * 100,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["Price", "Change", "Change (%)"])
+
+@cached(SPLITS_TTL)
+@timed()
 def fetch_splits(ticker):
-    ticker = yf.Ticker(ticker)
-    return ticker.splits
+    return transport.call(transport.YAHOO_HOST, sources.current().splits, ticker)
 
-@st.cache_data
+@cached(TABLE_TTL)
+@timed()
 def fetch_table(url):
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+    proxy = proxy_pool.acquire() if sources.current().uses_proxies else None
+    # Keep-alive session of the proxy, the host's pooled session while the
+    # pool is empty
+    session = proxy.session if proxy is not None else None
     try:
-        proxy = FreeProxy().get()
-        proxies_dict = {
-            "http": proxy
-        }
-        response = requests.get(url, headers=headers, proxies=proxies_dict, timeout=5)
-        df = pd.read_html(response.content)
+        start = time.perf_counter()
+        try:
+            with metrics.span("fetch_table.page"):
+                text = sources.current().page(url, session=session)
+        except Exception as e:
+            if proxy is None or not is_proxy_failure(e):
+                raise
+            # The proxy is ejected and the page fetched again directly
+            proxy_pool.report(proxy.address, ok=False)
+            proxy = None
+            with metrics.span("fetch_table.page"):
+                text = sources.current().page(url)
+        if proxy is not None:
+            proxy_pool.report(proxy.address, ok=True, latency=time.perf_counter() - start)
+        metrics.observe_size("fetch_table", len(text))
+        with metrics.span("fetch_table.read_html"):
+            df = pd.read_html(io.StringIO(text))
         return df[0]
     except Exception as e:
         return e
 
+@timed()
+def fetch_tables(urls):
+    # All pages at once, so the wait is the slowest page rather than the sum
+    urls = list(urls)
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls))) as executor:
+        return dict(zip(urls, executor.map(fetch_table, urls)))
+
+# ---- SYMBOLS ----
+def is_unknown_symbol(info):
+    # Yahoo answers an unknown symbol with a 404 or with info lacking a quoteType
+    if isinstance(info, Exception):
+        response = getattr(info, "response", None)
+        return getattr(response, "status_code", None) == 404
+    return not info or not info.get("quoteType")
+
+def quote_types(tickers):
+    # quoteType of every ticker: from the local symbol master, upstream info
+    # for the unlisted ones (fetched together). None for a symbol upstream
+    # doesn't know, the exception when the lookup itself failed.
+    master = symbol_master()
+    types = {}
+    for ticker in tickers:
+        entry = master.get(ticker)
+        if entry is not None:
+            types[ticker] = entry["quoteType"]
+    unlisted = [ticker for ticker in tickers if ticker not in types]
+    for ticker, info in fetch_infos(unlisted).items():
+        if is_unknown_symbol(info):
+            types[ticker] = None
+        elif isinstance(info, Exception):
+            types[ticker] = info
+        else:
+            types[ticker] = info["quoteType"]
+    return {ticker: types[ticker] for ticker in tickers}
+
+def suggest_symbols(prefix, limit=10):
+    return symbol_master().suggest(prefix, limit=limit)
+
+# ---- COMPARISON ----
+@timed()
+def align_closes(histories, interval="1d"):
+    """Aligns the closes of several tickers into one price matrix.
+
+    histories maps tickers to Bars. Daily and longer bars are aligned on the
+    exchange-local date, so .NS and US tickers share rows despite their time
+    zones; intraday bars are aligned on UTC time. Days one exchange was closed
+    carry its last close. Returns the rows where every ticker has a price, one
+    column per ticker.
+    """
+    closes = {}
+    for ticker, bars in histories.items():
+        index = bars.index
+        if is_intraday(interval):
+            index = index.tz_convert("UTC") if index.tz is not None else index
+        else:
+            index = (index.tz_localize(None) if index.tz is not None else index).normalize()
+        close = pd.Series(bars.close, index=index)
+        closes[ticker] = close[~close.index.duplicated(keep="last")]
+
+    if not closes:
+        return pd.DataFrame()
+
+    # Union of the calendars, then keep the rows where every ticker has a price
+    return pd.concat(closes, axis=1).sort_index().ffill().dropna()
+
+@timed()
+def compare_tickers(histories, interval="1d"):
+    """Wide matrix of the percent changes of several tickers since their first common row."""
+    closes = align_closes(histories, interval)
+    if closes.empty:
+        return closes
+
+    values = closes.to_numpy(dtype=float)
+    pct = values / values[0] - 1
+    return pd.DataFrame(pct, index=closes.index, columns=closes.columns)
+
+@cached(batch_ttl)
+@timed()
+def fetch_comparison(tickers, period="3mo", interval="1d", start=None):
+    try:
+        histories = fetch_histories(tickers, period=period, interval=interval, start=start)
+        histories = {
+            ticker: history for ticker, history in histories.items()
+            if not isinstance(history, Exception)
+        }
+        return compare_tickers(histories, interval)
+    except Exception as e:
+        return e
+
+@cached(portfolio_ttl)
+@timed()
+def fetch_portfolio(tickers, weights=None, benchmark="^GSPC", period="1y", interval="1d", start=None):
+    # Cached per (ticker set, weights, benchmark, period); the histories come
+    # from the download the sidebar's batch already made
+    try:
+        histories = {}
+        for ticker, history in fetch_histories(tickers, period=period, interval=interval, start=start).items():
+            if isinstance(history, Exception):
+                raise history
+            histories[ticker] = history
+        if benchmark and benchmark not in histories:
+            bars = fetch_bars(benchmark, period=period, interval=interval, start=start)
+            if isinstance(bars, Exception):
+                raise bars
+            histories[benchmark] = bars
+
+        closes = align_closes(histories, interval)
+        if len(closes) < 2:
+            raise ValueError("Not enough common price history for the selected securities")
+        prices = closes[list(tickers)]
+        return portfolio.analyze(
+            prices,
+            weights=weights,
+            benchmark=closes[benchmark] if benchmark else None,
+            interval=interval,
+        )
+    except Exception as e:
+        return e
+
+# ---- BACKTEST ----
+def _closes(ticker, period, interval, start=None):
+    bars = fetch_bars(ticker, period=period, interval=interval, start=start)
+    if isinstance(bars, Exception):
+        raise bars
+    return pd.Series(bars.close, index=bars.index, copy=False)
+
+@cached(backtest_ttl)
+@timed()
+def fetch_backtest(ticker, strategy, period="1y", interval="1d", start=None):
+    try:
+        close = _closes(ticker, period, interval, start)
+        return backtest.run(close, strategy, interval=interval)
+    except Exception as e:
+        return e
+
+@cached(history_ttl)
+@timed()
+def fetch_sweep(ticker, period="1y", interval="1d", start=None):
+    # Every SMA window pair of backtest.SWEEP_WINDOWS, spread over a process pool
+    try:
+        close = _closes(ticker, period, interval, start)
+        return backtest.sweep(close, interval=interval)
+    except Exception as e:
+        return e
+
+# ---- PREFETCH ----
+DEFAULT_SECURITY = "TATAMOTORS.NS"
+
+
+def security_view(ticker):
+    """Prefetch view of the index and security sections: the info of the
+    ticker and the snapshot of its basket."""
+    return ("security", tuple(snapshot_basket(ticker)), ticker)
+
+def watchlist_view(tickers, period, interval):
+    """Prefetch view of the watchlist sections: the batch and the comparison."""
+    return ("watchlist", tuple(tickers), period, interval)
+
+def warm_view(view, market_open):
+    # Refetches the calls of a view before they expire, with the arguments
+    # the page calls them with, so the page's own calls are cache hits
+    within = OPEN_INTERVAL if market_open else CLOSED_INTERVAL
+    kind, tickers, *args = view
+    if kind == "security":
+        ticker, = args
+        fetch_info.warm(within, ticker)
+        fetch_snapshot.warm(within, list(tickers))
+    elif kind == "watchlist":
+        period, interval = args
+        # The download first, so the batch and the comparison are rebuilt from it
+        fetch_histories.warm(within, list(tickers), period=period, interval=interval)
+        fetch_batch.warm(within, list(tickers), period=period, interval=interval)
+        fetch_comparison.warm(within, list(tickers), period=period, interval=interval)
+
+prefetcher = Prefetcher(warm_view, defaults=[security_view(DEFAULT_SECURITY)])
+
+# ---- LIVE ----
+def live_ttl(ticker=None, interval="1m"):
+    return poll_interval(interval)
+
+@cached(live_ttl)
+@timed()
+def fetch_latest_bars(ticker, interval="1m"):
+    # Today's bars only, the live buffer keeps those it doesn't have yet.
+    # Cached until the next poll is due, so every reader of a ticker shares
+    # one upstream call per poll.
+    try:
+        return _download_history(ticker, period="1d", interval=interval)
+    except Exception as e:
+        return e
+
+live_feed = LiveFeed(fetch_latest_bars)
+
 def format_value(value):
     # Split the string at the first space
     base_value, change = value.split(' ', 1)
@@ -97,7 +508,9 @@ def remove_duplicates(lst):
             seen.add(item)
     return result
 
+@timed()
 def top_table(df):
+    import plotly.graph_objects as go
     fig = go.Figure(data=[go.Table(
         header=dict(values=list(df.columns),
                     fill_color='lightgrey',
@@ -113,6 +526,7 @@ def top_table(df):
     return fig
 
 
+@timed()
 def info_table(info):
     data = {}
 
@@ -161,13 +575,138 @@ def info_table(info):
 
     return df
 
-# ---- CHARTS ----
-def plot_gauge(df, ticker):
-    df = df[df['Ticker'] == ticker]
+def plotly_chart(fig, name="figure", **kwargs):
+    # st.plotly_chart, timed since it validates and serializes the figure
+    if isinstance(fig, FigureDict):
+        metrics.observe_size(f"figure.{name}", fig.nbytes)
+    with metrics.span(f"serialize.{name}"):
+        st.plotly_chart(fig, **kwargs)
+
+class FigureDict(dict):
+    """Built figure as plotly_chart takes it, with the size of its JSON."""
+
+    __slots__ = ("nbytes",)
+
+    def __init__(self, figure, nbytes):
+        super().__init__(figure)
+        self.nbytes = nbytes
+
+@timed()
+def cached_figure(plot, data, *args, version=None, **params):
+    # plot(data, *args, **params) as a figure dict for plotly_chart. version
+    # identifies data, e.g. the version of the cache entry it comes from plus
+    # whatever it was sliced or derived with, so the figure is cached under
+    # the plot, that version and the other arguments. Without a version the
+    # figure is built every time. A dict is cheaper for Streamlit to take
+    # than a Figure (no to_dict copy).
+    if version is None:
+        figure = plot(data, *args, **params).to_json()
+        return FigureDict(json.loads(figure), len(figure))
+    key = (plot.__name__, version, freeze(args), freeze(params))
+    found, figure = figure_cache.get(key)
+    if not found:
+        payload = plot(data, *args, **params).to_json()
+        figure = FigureDict(json.loads(payload), len(payload))
+        figure_cache.set(key, figure, FIGURE_TTL)
+    # Plotly pops and puts back the type of every trace while validating,
+    # so each render gets its own trace dicts (not copies of their data)
+    return FigureDict(dict(figure, data=[dict(trace) for trace in figure["data"]]), figure.nbytes)
+
+# ---- DOWNSAMPLING ----
+MAX_POINTS = 2000  # max points per trace sent to the browser
+
+SUM_COLUMNS = ['Volume', 'Dividends']
+
+
+@timed()
+def slice_range(df, x_range=None):
+    """Keeps the bars inside x_range, a (start, end) pair in the index's local time."""
+    if x_range is None or df.empty:
+        return df
+    start, end = (pd.Timestamp(x) for x in x_range)
+    index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    return df[(index >= start) & (index <= end)]
+
+
+@timed()
+def resample_ohlc(df, max_points=MAX_POINTS):
+    """Merges consecutive bars so that at most max_points candles are left."""
+    n = len(df)
+    if max_points is None or n <= max_points:
+        return df
+
+    size = -(-n // max_points)
+    starts = np.arange(0, n, size)
+    ends = np.append(starts[1:], n) - 1
+
+    data = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col == 'Open':
+            data[col] = values[starts]
+        elif col == 'High':
+            data[col] = np.fmax.reduceat(values, starts)
+        elif col == 'Low':
+            data[col] = np.fmin.reduceat(values, starts)
+        elif col in SUM_COLUMNS:
+            data[col] = np.add.reduceat(np.nan_to_num(values), starts)
+        elif 'Crossover' in col:
+            # Keep a signal if the bucket contains one
+            data[col] = np.sign(np.add.reduceat(np.nan_to_num(values), starts))
+        else:
+            # Close and the indicators take their value at the end of the bucket
+            data[col] = values[ends]
+
+    resampled = pd.DataFrame(data, index=df.index[starts])
+    if 'ΔVolume%' in resampled.columns:
+        resampled['ΔVolume%'] = (resampled['Volume'].pct_change() * 100).round(2)
+    return resampled
+
+
+def lttb(x, y, max_points=MAX_POINTS):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets."""
+    n = len(y)
+    if max_points is None or n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
 
-    initial_price = df['Close'].iloc[0]
-    last_price = df['Close'].iloc[-1]
-    last_pct = df['Pct_change'].iloc[-1] * 100
+    # First and last points are always kept, the rest is split into buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    kept = np.empty(max_points, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+
+        # Keep the point making the largest triangle with the last kept point
+        # and the average of the next bucket
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
+
+
+@timed()
+def downsample_line(df, column, max_points=MAX_POINTS):
+    """Reduces df to at most max_points rows, keeping the shape of df[column]."""
+    if max_points is None or len(df) <= max_points:
+        return df
+    x = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else np.arange(len(df))
+    return df.iloc[lttb(x, df[column].to_numpy(), max_points)]
+
+# ---- CHARTS ----
+@timed()
+def plot_gauge(pct, ticker):
+    # pct is the wide percent-change matrix from compare_tickers
+    import plotly.graph_objects as go
+    last_pct = pct[ticker].iloc[-1] * 100
     color_pct = 'green' if last_pct > 0 else 'red'
 
     fig = go.Figure(go.Indicator(
@@ -189,7 +728,12 @@ def plot_gauge(df, ticker):
 
     return fig
 
-def plot_candles_stick_bar(df, title="", currency=""):
+@timed()
+def plot_candles_stick_bar(df, title="", currency="", max_points=MAX_POINTS):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    df = resample_ohlc(df, max_points)
 
     rows = 1
     row_heights = [7]
@@ -232,33 +776,30 @@ def plot_candles_stick_bar(df, title="", currency=""):
         elif 'Crossover' in col_name:
 
             first_period = col_name.split('_')[1].split('/')[0]
+            sma = df[f'SMA_{first_period}'].to_numpy()
+            buy, sell = crossover_points(df[col_name].to_numpy())
+
+            # One marker trace per signal type instead of one annotation per signal
+            fig.add_trace(go.Scatter(x=df.index[buy],
+                                     y=sma[buy],
+                                     mode='markers',
+                                     marker=dict(symbol='triangle-up', size=12, color='green'),
+                                     name="Golden cross",
+                                     hovertemplate='Golden cross<br>%{x}<br>%{y:.2f}<extra></extra>'),
+                          row=1, col=1)
 
-            for i, v in df[col_name].items():
-
-                if v == 1.0:  # Buy signal
-
-                    fig.add_annotation(x=df.index[i], y=df[f'SMA_{first_period}'][i],
-                                       text="Golden cross",
-                                       showarrow=True,
-                                       arrowhead=1,
-                                       arrowsize=1,
-                                       ay=60
-                                       )
-
-                if v == -1.0:  # Sell signal
-
-                    fig.add_annotation(x=df.index[i], y=df[f'SMA_{first_period}'][i],
-                                       text="Death cross",
-                                       showarrow=True,
-                                       arrowhead=1,
-                                       arrowsize=1,
-                                       ay=-60
-                                       )
+            fig.add_trace(go.Scatter(x=df.index[sell],
+                                     y=sma[sell],
+                                     mode='markers',
+                                     marker=dict(symbol='triangle-down', size=12, color='red'),
+                                     name="Death cross",
+                                     hovertemplate='Death cross<br>%{x}<br>%{y:.2f}<extra></extra>'),
+                          row=1, col=1)
 
         if col_name == 'Volume':
             row += 1
 
-            volume_colors = ['green' if df['Close'].iloc[i] > df['Open'].iloc[i] else 'red' for i in range(len(df))]
+            volume_colors = np.where(df['Close'].to_numpy() > df['Open'].to_numpy(), 'green', 'red')
 
             fig.add_trace(go.Bar(x=df.index,
                                  y=df[col_name],
@@ -293,7 +834,7 @@ def plot_candles_stick_bar(df, title="", currency=""):
                               row=row, col=1)
 
             if 'MACD_Hist' in df.columns:
-                MACD_colors = ['green' if df['MACD_Hist'][i] > 0 else 'red' for i in range(len(df))]
+                MACD_colors = np.where(df['MACD_Hist'].to_numpy() > 0, 'green', 'red')
 
                 fig.add_trace(go.Bar(x=df.index,
                                      y=df['MACD_Hist'],
@@ -348,7 +889,11 @@ def plot_candles_stick_bar(df, title="", currency=""):
     return fig
 
 
-def plot_candles_stick(df, title="", time_span=None):
+@timed()
+def plot_candles_stick(df, title="", time_span=None, max_points=MAX_POINTS):
+    import plotly.graph_objects as go
+
+    df = resample_ohlc(df, max_points)
 
     fig = go.Figure()
 
@@ -393,14 +938,16 @@ def plot_candles_stick(df, title="", time_span=None):
 
     return fig
 
-def plot_line_multiple(df, title=""):
+@timed()
+def plot_line_multiple(pct, title="", max_points=MAX_POINTS):
+    # pct is the wide percent-change matrix from compare_tickers, one column per ticker
+    import plotly.graph_objects as go
     fig = go.Figure()
 
-    dfs = df.groupby('Ticker')
-
-    for df_name, df in dfs:
+    for df_name in pct.columns:
+        df = downsample_line(pct[[df_name]], df_name, max_points)
         fig.add_trace(go.Scatter(x=df.index,
-                                 y=df['Pct_change'],
+                                 y=df[df_name],
                                  mode='lines',
                                  name=f'{df_name}',
                                  meta=df_name,
@@ -452,3 +999,120 @@ def plot_line_multiple(df, title=""):
 
     return fig
 
+@timed()
+def plot_correlation(correlation, title=""):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Heatmap(z=correlation.to_numpy(),
+                               x=list(correlation.columns),
+                               y=list(correlation.index),
+                               zmin=-1,
+                               zmax=1,
+                               colorscale='RdBu',
+                               texttemplate='%{z:.2f}',
+                               hovertemplate='%{x} / %{y}: %{z:.2f}<extra></extra>', )
+                    )
+
+    fig.update_layout(
+        title=title,
+        yaxis=dict(autorange='reversed'),
+        height=500
+    )
+
+    return fig
+
+@timed()
+def plot_equity(equity, title="", max_points=MAX_POINTS):
+    # equity is the frame from portfolio.analyze: value of 1 invested and rolling volatility
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3],
+                        vertical_spacing=0.05)
+
+    for row, column in enumerate(["Equity", "Rolling volatility"], start=1):
+        df = downsample_line(equity[[column]].dropna(), column, max_points)
+        fig.add_trace(go.Scatter(x=df.index,
+                                 y=df[column],
+                                 mode='lines',
+                                 name=column,
+                                 hovertemplate=f'{column}: %{{y:.2f}}<extra></extra>', ),
+                      row=row, col=1)
+
+    fig.update_layout(
+        title=title,
+        hovermode='x',
+        showlegend=False,
+        height=600
+    )
+    fig.update_yaxes(title_text='Value', row=1, col=1)
+    fig.update_yaxes(title_text='Volatility', tickformat='.0%', row=2, col=1)
+
+    return fig
+
+@timed()
+def plot_sweep(stats, column="Sharpe", title=""):
+    # stats is the frame from backtest.sweep, indexed by (Fast, Slow) windows
+    import plotly.graph_objects as go
+    grid = stats[column].unstack("Slow").sort_index()
+    fig = go.Figure(go.Heatmap(z=grid.to_numpy(),
+                               x=grid.columns,
+                               y=grid.index,
+                               colorscale='RdYlGn',
+                               zmid=0,
+                               hovertemplate=f'SMA %{{y}}/%{{x}}: %{{z:.2f}} {column}<extra></extra>', )
+                    )
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='Slow SMA',
+        yaxis_title='Fast SMA',
+        height=500
+    )
+
+    return fig
+
+@timed()
+def plot_live_candles(df, title=""):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+
+    fig.add_trace(go.Candlestick(x=df.index,
+                                 open=df['Open'],
+                                 high=df['High'],
+                                 low=df['Low'],
+                                 close=df['Close'],
+                                 name="OHVC")
+                  )
+
+    fig.update_layout(
+        title=title,
+        yaxis_title='Price',
+        showlegend=False,
+        xaxis_rangeslider_visible=False,
+        uirevision=title,  # keep the user's zoom across updates
+        height=350,
+        margin=dict(t=40, b=0, l=0, r=0)
+    )
+
+    return fig
+
+@timed()
+def extend_live_candles(fig, df, max_points=LIVE_CAPACITY):
+    # Appends new bars to the existing trace. df starts at the last bar already
+    # drawn, which is replaced since it may have changed.
+    if df.empty:
+        return fig
+
+    trace = fig.data[0]
+    x = list(trace.x)
+    keep = len(x) - 1 if x and pd.Timestamp(x[-1]) == df.index[0] else len(x)
+
+    def extend(old, new):
+        return (list(old[:keep]) + list(new))[-max_points:]
+
+    trace.x = extend(trace.x, df.index)
+    trace.open = extend(trace.open, df['Open'])
+    trace.high = extend(trace.high, df['High'])
+    trace.low = extend(trace.low, df['Low'])
+    trace.close = extend(trace.close, df['Close'])
+
+    return fig
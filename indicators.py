@@ -0,0 +1,246 @@
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+from metrics import timed
+
+# ---- TECHNICAL INDICATORS ----
+# Computes the columns plot_candles_stick_bar knows how to draw (SMA_*, EMA_*,
+# MACD/Signal/MACD_Hist, RSI, ATR, ΔVolume%, Crossover_*) in vectorized passes.
+# Every array, including intermediates such as the EMAs used by MACD or the
+# Wilder averages behind RSI, is kept per series together with the rolling
+# state needed to extend it. Toggling one indicator doesn't recompute the
+# others, and appending N bars only costs O(N).
+
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+
+MEMO_SIZE = 64  # number of series kept in memory
+
+_series = OrderedDict()
+_lock = threading.Lock()
+
+
+def sma(values, window):
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+def ema(values, span):
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def wilder(values, period):
+    # Wilder's smoothing is an EMA with alpha = 1 / period
+    return pd.Series(values).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+
+
+def _seeded(smooth, seed, values, param):
+    # An EMA continued from its last value: smoothing [seed, x1, ..., xN] with
+    # adjust=False gives exactly the next N values of the full series
+    return smooth(np.concatenate(([seed], values)), param)[1:]
+
+
+def true_range(high, low, close):
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return tr
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + rs))
+
+
+def crossover(fast, slow):
+    """+1.0 where fast crosses above slow, -1.0 where it crosses below, else 0."""
+    above = np.where(np.isnan(fast) | np.isnan(slow), np.nan, np.sign(fast - slow))
+    signal = np.zeros(len(above))
+    prev, curr = above[:-1], above[1:]
+    valid = ~np.isnan(prev) & ~np.isnan(curr)
+    signal[1:][valid & (prev <= 0) & (curr > 0)] = 1.0
+    signal[1:][valid & (prev >= 0) & (curr < 0)] = -1.0
+    return signal
+
+
+def crossover_points(signal):
+    """Positions of the buy (+1) and sell (-1) signals of a crossover column."""
+    signal = np.asarray(signal)
+    return np.flatnonzero(signal == 1.0), np.flatnonzero(signal == -1.0)
+
+
+def output_columns(name):
+    """Columns added to the frame for an indicator selected in the sidebar."""
+    if name == "MACD":
+        return ["MACD", "Signal", "MACD_Hist"]
+    if name.startswith("Crossover_"):
+        fast, slow = name.split("_")[1].split("/")
+        return [f"SMA_{fast}", f"SMA_{slow}", name]
+    return [name]
+
+
+class SeriesIndicators:
+    """Indicator arrays for one price series plus what is needed to extend them."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.base = {}  # Close, High, Low and Volume as float arrays
+        self.columns = {}  # indicators and intermediates, dependencies first
+
+    def _anchor(self, df):
+        # Number of leading bars df shares with the stored series. The last
+        # stored bar may still have been forming, so it is always recomputed.
+        if self.index is None or len(self.index) < 2 or df.index[0] != self.index[0]:
+            return 0
+        anchor = len(self.index) - 1
+        if len(df) < anchor or df.index[anchor - 1] != self.index[anchor - 1]:
+            return 0
+        # Adjusted prices are rewritten after splits and dividends
+        if df["Close"].iat[anchor - 1] != self.base["Close"][anchor - 1]:
+            return 0
+        return anchor
+
+    def sync(self, df):
+        """Brings every stored array in line with df, incrementally if possible."""
+        anchor = self._anchor(df)
+
+        self.index = df.index
+        self.base = {
+            col: df[col].to_numpy(dtype=float)
+            for col in ["Close", "High", "Low", "Volume"] if col in df.columns
+        }
+
+        old = self.columns
+        self.columns = {}
+        for name, values in old.items():
+            if anchor == 0:
+                self.columns[name] = self._freeze(self._compute(name, 0))
+            else:
+                tail = self._compute(name, anchor, values)
+                self.columns[name] = self._freeze(np.concatenate((values[:anchor], tail)))
+
+    def get(self, name):
+        if name not in self.columns:
+            self.columns[name] = self._freeze(self._compute(name, 0))
+        return self.columns[name]
+
+    @staticmethod
+    def _freeze(values):
+        # Shared between sessions, so make sure nobody modifies it in place
+        values.flags.writeable = False
+        return values
+
+    def _compute(self, name, anchor, old=None):
+        """Values of an indicator from position anchor on (0 means all of them).
+
+        Dependencies are read through get(), so they are created on first use
+        and, during sync, have already been brought up to date.
+        """
+        close = self.base["Close"]
+        seed = old[anchor - 1] if old is not None and anchor > 0 else np.nan
+        seeded = not np.isnan(seed)
+
+        if name.startswith("SMA_"):
+            window = int(name.split("_")[1])
+            start = max(0, anchor - window + 1)
+            return sma(close[start:], window)[anchor - start:]
+
+        if name.startswith("EMA_"):
+            span = int(name.split("_")[1])
+            if seeded:
+                return _seeded(ema, seed, close[anchor:], span)
+            return ema(close, span)[anchor:]
+
+        if name == "MACD":
+            return self.get(f"EMA_{MACD_FAST}")[anchor:] - self.get(f"EMA_{MACD_SLOW}")[anchor:]
+
+        if name == "Signal":
+            macd = self.get("MACD")
+            if seeded:
+                return _seeded(ema, seed, macd[anchor:], MACD_SIGNAL)
+            return ema(macd, MACD_SIGNAL)[anchor:]
+
+        if name == "MACD_Hist":
+            return self.get("MACD")[anchor:] - self.get("Signal")[anchor:]
+
+        if name in ["RSI_gain", "RSI_loss"]:
+            delta = np.diff(close, prepend=np.nan)
+            moves = np.clip(delta if name == "RSI_gain" else -delta, 0, None)
+            if seeded:
+                return _seeded(wilder, seed, moves[anchor:], RSI_PERIOD)
+            return wilder(moves, RSI_PERIOD)[anchor:]
+
+        if name == "RSI":
+            return rsi_from_averages(self.get("RSI_gain")[anchor:], self.get("RSI_loss")[anchor:])
+
+        if name == "ATR":
+            high, low = self.base["High"], self.base["Low"]
+            if seeded:
+                tr = true_range(high[anchor - 1:], low[anchor - 1:], close[anchor - 1:])[1:]
+                return _seeded(wilder, seed, tr, ATR_PERIOD)
+            return wilder(true_range(high, low, close), ATR_PERIOD)[anchor:]
+
+        if name.startswith("Crossover_"):
+            fast, slow = name.split("_")[1].split("/")
+            start = max(0, anchor - 1)
+            signal = crossover(self.get(f"SMA_{fast}")[start:], self.get(f"SMA_{slow}")[start:])
+            return signal[anchor - start:]
+
+        if name == "ΔVolume%":
+            start = max(0, anchor - 1)
+            pct = pd.Series(self.base["Volume"][start:]).pct_change().to_numpy()
+            return np.round(pct * 100, 2)[anchor - start:]
+
+        raise ValueError(f"Unknown indicator: {name}")
+
+
+def _get_series(key):
+    with _lock:
+        if key in _series:
+            _series.move_to_end(key)
+            return _series[key]
+
+        series = SeriesIndicators()
+        _series[key] = series
+        if len(_series) > MEMO_SIZE:
+            _series.popitem(last=False)
+        return series
+
+
+@timed()
+def add_indicators(df, indicators, key=None):
+    """Returns a copy of df with the requested indicator columns added.
+
+    indicators is a list of names such as "SMA_20", "EMA_50", "MACD", "RSI",
+    "ATR" or "Crossover_20/50". key identifies the series, e.g. (ticker,
+    period, interval); results are kept under it and only the new bars are
+    computed the next time the same series comes in with bars appended.
+    Without a key nothing is kept.
+    """
+    out = df.copy()
+    if df.empty:
+        return out
+
+    series = SeriesIndicators() if key is None else _get_series(tuple(key))
+
+    with series.lock:
+        series.sync(df)
+        for name in indicators:
+            for col in output_columns(name):
+                out[col] = series.get(col)
+        if "Volume" in df.columns:
+            out["ΔVolume%"] = series.get("ΔVolume%")
+
+    return out
+
+
+def clear(key=None):
+    """Drops the kept series, only the one under key if given."""
+    with _lock:
+        if key is None:
+            _series.clear()
+        else:
+            _series.pop(tuple(key), None)
@@ -0,0 +1,189 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import store
+
+# ---- LIVE QUOTES ----
+# A background poller pushes only the new bars of each watched ticker into a
+# fixed-size ring buffer. Pages read the buffers and append what they haven't
+# drawn yet, instead of refetching and rebuilding everything. Each ticker is
+# polled a few times per bar, since that is how often the forming bar changes.
+
+LIVE_CAPACITY = 500  # bars kept per ticker
+POLLS_PER_BAR = 4
+MIN_POLL_INTERVAL = 15  # seconds, also the shortest TTL of the polled bars
+TICK = 1.0  # seconds between scheduler passes
+SUBSCRIPTION_TTL = 60  # seconds a ticker is polled after its last reader left
+POLL_WORKERS = 10
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def poll_interval(interval):
+    """Seconds between two polls of a ticker's bars of this interval."""
+    bar = store.INTERVAL_DURATIONS.get(interval, pd.Timedelta(minutes=1))
+    return max(MIN_POLL_INTERVAL, bar.total_seconds() / POLLS_PER_BAR)
+
+
+class RingBuffer:
+    """Last `capacity` OHLCV bars of one ticker in contiguous NumPy arrays.
+
+    The arrays are twice the capacity and compacted when the end is reached,
+    so appending is amortized O(1) and the live bars are always one slice.
+    """
+
+    def __init__(self, capacity=LIVE_CAPACITY):
+        self.capacity = capacity
+        self.times = np.zeros(2 * capacity, dtype=np.int64)  # epoch nanoseconds
+        self.values = np.zeros((2 * capacity, len(FIELDS)), dtype=np.float64)
+        self.start = 0
+        self.end = 0
+        self.version = 0  # incremented on every change
+        self.tz = None
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def last_time(self):
+        return self.times[self.end - 1] if self.end > self.start else None
+
+    def push(self, bars):
+        """Adds the bars of a history frame that are not older than the last one.
+
+        A bar with the same timestamp as the last one replaces it, since the
+        last bar keeps changing until it closes.
+        """
+        if bars.empty:
+            return 0
+        times = bars.index.as_unit("ns").asi8  # pandas may default to microseconds
+        values = bars[FIELDS].to_numpy(dtype=np.float64)
+
+        with self.lock:
+            if self.tz is None:
+                self.tz = bars.index.tz
+            last = self.last_time
+            if last is not None:
+                keep = times >= last
+                times, values = times[keep], values[keep]
+                if len(times) and times[0] == last:
+                    self.values[self.end - 1] = values[0]
+                    times, values = times[1:], values[1:]
+                    self.version += 1
+
+            n = len(times)
+            if n == 0:
+                return 0
+            if n > self.capacity:
+                times, values = times[-self.capacity:], values[-self.capacity:]
+                n = self.capacity
+
+            if self.end + n > len(self.times):
+                # Move the bars still needed back to the front
+                keep = min(len(self), self.capacity - n)
+                self.times[:keep] = self.times[self.end - keep:self.end]
+                self.values[:keep] = self.values[self.end - keep:self.end]
+                self.start, self.end = 0, keep
+
+            self.times[self.end:self.end + n] = times
+            self.values[self.end:self.end + n] = values
+            self.end += n
+            self.start = max(self.start, self.end - self.capacity)
+            self.version += 1
+            return n
+
+    def frame(self, since=None):
+        """Bars from timestamp `since` (epoch ns, inclusive) on, as a DataFrame."""
+        with self.lock:
+            times = self.times[self.start:self.end]
+            values = self.values[self.start:self.end]
+            if since is not None:
+                first = np.searchsorted(times, since)
+                times, values = times[first:], values[first:]
+            index = pd.to_datetime(times.copy(), utc=True)
+            if self.tz is not None:
+                index = index.tz_convert(self.tz)
+            return pd.DataFrame(values.copy(), index=index, columns=FIELDS), self.version
+
+
+class LiveFeed:
+    """Polls source(ticker, interval) for the watched tickers on a daemon thread.
+
+    source must return a history frame with at least the latest bars; only
+    those not older than the last buffered bar are pushed. Each ticker is
+    polled every poll_interval(interval) seconds.
+    """
+
+    def __init__(self, source, capacity=LIVE_CAPACITY, poll_interval=poll_interval):
+        self.source = source
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        self.errors = 0
+        self._buffers = {}  # (ticker, interval) -> RingBuffer
+        self._seen = {}  # (ticker, interval) -> monotonic time of the last read
+        self._due = {}  # (ticker, interval) -> monotonic time of the next poll
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=POLL_WORKERS)
+
+    def subscribe(self, ticker, interval):
+        """Buffer of a ticker, which keeps being polled while it is read."""
+        key = (ticker, interval)
+        with self._lock:
+            if key not in self._buffers:
+                self._buffers[key] = RingBuffer(self.capacity)
+            self._seen[key] = time.monotonic()
+            buffer = self._buffers[key]
+        self.start()
+        if len(buffer) == 0:
+            self.poll(key)
+        return buffer
+
+    def poll(self, key):
+        ticker, interval = key
+        self._due[key] = time.monotonic() + self.poll_interval(interval)
+        try:
+            bars = self.source(ticker, interval)
+            if isinstance(bars, Exception):
+                raise bars
+            self._buffers[key].push(bars)
+        except Exception:
+            self.errors += 1
+
+    def poll_all(self, now=None):
+        """Polls the tickers that are due, returns how many were."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # Tickers nobody looked at for a while are dropped
+            for key in [k for k, seen in self._seen.items() if now - seen > SUBSCRIPTION_TTL]:
+                del self._seen[key]
+                del self._buffers[key]
+                self._due.pop(key, None)
+            keys = [key for key in self._buffers if self._due.get(key, 0) <= now]
+        list(self._executor.map(self.poll, keys))
+        return len(keys)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stops polling in the background, once the current pass is done."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopped.set()
+            thread.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.poll_all()
+            self._stopped.wait(TICK)
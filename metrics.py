@@ -0,0 +1,162 @@
+import os
+import time
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+from cache import market_cache, flights
+
+# ---- INSTRUMENTATION ----
+# Timing spans and payload sizes per operation (fetchers, transforms, plots,
+# figure serialization), kept in bounded reservoirs, with percentiles for the
+# debug panel and a Prometheus text export. Off unless METRICS=1 is set or
+# enable() is called; disabled spans cost one global lookup.
+
+RESERVOIR = 1024  # latest observations kept per operation
+QUANTILES = [0.5, 0.9, 0.99]
+PREFIX = "financedash"
+
+_enabled = os.environ.get("METRICS", "") not in ["", "0"]
+_durations = {}  # operation -> Series
+_sizes = {}  # operation -> Series
+_lock = threading.Lock()
+_null = nullcontext()
+
+
+class Series:
+    """Count and sum of all observations plus a reservoir of the latest ones."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.values = deque(maxlen=RESERVOIR)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.values.append(value)
+
+    def summary(self):
+        values = np.fromiter(self.values, dtype=float, count=len(self.values))
+        quantiles = np.quantile(values, QUANTILES) if len(values) else [np.nan] * len(QUANTILES)
+        return {
+            "count": self.count,
+            "total": self.total,
+            **{f"p{round(q * 100)}": v for q, v in zip(QUANTILES, quantiles)},
+            "max": values.max() if len(values) else np.nan,
+        }
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _durations.clear()
+        _sizes.clear()
+
+
+def _observe(table, name, value):
+    with _lock:
+        series = table.get(name)
+        if series is None:
+            series = table[name] = Series()
+        series.add(value)
+
+
+def observe_time(name, seconds):
+    if _enabled:
+        _observe(_durations, name, seconds)
+
+
+def observe_size(name, nbytes):
+    if _enabled:
+        _observe(_sizes, name, nbytes)
+
+
+@contextmanager
+def _span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe(_durations, name, time.perf_counter() - start)
+
+
+def span(name):
+    """Context manager timing a block as operation name."""
+    return _span(name) if _enabled else _null
+
+
+def timed(name=None):
+    """Decorator timing every call of a function (named after it by default)."""
+    def decorator(func):
+        operation = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _observe(_durations, operation, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def summary():
+    """Per-operation duration (seconds) and payload size (bytes) statistics."""
+    with _lock:
+        return (
+            {name: s.summary() for name, s in sorted(_durations.items())},
+            {name: s.summary() for name, s in sorted(_sizes.items())},
+        )
+
+
+def cache_summary(cache=market_cache, flight=flights):
+    """Hits, misses, evictions, entries and shared in-flight calls per fetcher."""
+    stats = cache.stats()
+    for name, count in flight.shared.items():
+        stats.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0, "entries": 0})
+    return {name: {**s, "shared": flight.shared[name]} for name, s in sorted(stats.items())}
+
+
+def _summary_lines(metric, unit, stats):
+    lines = [f"# TYPE {metric}_{unit} summary"]
+    for name, s in stats.items():
+        for q in QUANTILES:
+            value = s[f"p{round(q * 100)}"]
+            lines.append(f'{metric}_{unit}{{operation="{name}",quantile="{q}"}} {value:.6g}')
+        lines.append(f'{metric}_{unit}_sum{{operation="{name}"}} {s["total"]:.6g}')
+        lines.append(f'{metric}_{unit}_count{{operation="{name}"}} {s["count"]}')
+    return lines
+
+
+def export(cache=market_cache, flight=flights):
+    """Everything recorded, plus the cache counters, in Prometheus text format."""
+    durations, sizes = summary()
+    lines = _summary_lines(f"{PREFIX}_operation", "seconds", durations)
+    lines += _summary_lines(f"{PREFIX}_payload", "bytes", sizes)
+
+    stats = cache_summary(cache, flight)
+    for counter in ["hits", "misses", "evictions", "shared"]:
+        lines.append(f"# TYPE {PREFIX}_cache_{counter}_total counter")
+        for name, s in stats.items():
+            lines.append(f'{PREFIX}_cache_{counter}_total{{fetcher="{name}"}} {s[counter]}')
+    lines.append(f"# TYPE {PREFIX}_cache_entries gauge")
+    for name, s in stats.items():
+        lines.append(f'{PREFIX}_cache_entries{{fetcher="{name}"}} {s["entries"]}')
+    return "\n".join(lines) + "\n"
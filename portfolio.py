@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+# ---- PORTFOLIO ANALYTICS ----
+# Batched NumPy operations over an aligned price matrix (rows are dates, one
+# column per ticker): every statistic is computed for all tickers at once.
+
+ROLLING_WINDOW = 21  # bars, about a month of daily bars
+TRADING_DAYS = 252
+
+PERIODS_PER_YEAR = {
+    "1d": TRADING_DAYS,
+    "5d": TRADING_DAYS / 5,
+    "1wk": 52,
+    "1mo": 12,
+    "3mo": 4,
+}
+
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30,
+                    "60m": 60, "90m": 90, "1h": 60}
+
+
+def periods_per_year(interval):
+    if interval in INTERVAL_MINUTES:
+        # 6.5 trading hours a day
+        return TRADING_DAYS * 390 / INTERVAL_MINUTES[interval]
+    return PERIODS_PER_YEAR.get(interval, TRADING_DAYS)
+
+
+def normalize_weights(weights, n):
+    """Weights summing to 1, equal weights if none (or only zeros) are given."""
+    if weights is None or len(weights) == 0:
+        return np.full(n, 1 / n)
+    weights = np.asarray(weights, dtype=float)
+    if len(weights) != n:
+        raise ValueError(f"Expected {n} weights, got {len(weights)}")
+    total = weights.sum()
+    return weights / total if total else np.full(n, 1 / n)
+
+
+def simple_returns(prices):
+    prices = np.asarray(prices, dtype=float)
+    return prices[1:] / prices[:-1] - 1
+
+
+def rolling_volatility(returns, window=ROLLING_WINDOW, annualization=TRADING_DAYS):
+    """Annualized rolling standard deviation of every column, via cumulative sums."""
+    returns = np.asarray(returns, dtype=float)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    result = np.full(returns.shape, np.nan)
+    if len(returns) < window:
+        return result
+
+    zeros = np.zeros((1, returns.shape[1]))
+    s1 = np.concatenate((zeros, np.cumsum(returns, axis=0)))
+    s2 = np.concatenate((zeros, np.cumsum(returns ** 2, axis=0)))
+    sum1 = s1[window:] - s1[:-window]
+    sum2 = s2[window:] - s2[:-window]
+    variance = (sum2 - sum1 ** 2 / window) / (window - 1)
+    result[window - 1:] = np.sqrt(np.clip(variance, 0, None) * annualization)
+    return result
+
+
+def betas(returns, benchmark_returns):
+    """Beta of every column against the benchmark return series."""
+    returns = np.asarray(returns, dtype=float)
+    bench = np.asarray(benchmark_returns, dtype=float)
+    returns_c = returns - returns.mean(axis=0)
+    bench_c = bench - bench.mean()
+    variance = bench_c @ bench_c
+    if variance == 0:
+        return np.full(returns.shape[1], np.nan)
+    return (bench_c @ returns_c) / variance
+
+
+def max_drawdowns(prices):
+    """Largest peak-to-trough loss of every column (as a negative fraction)."""
+    prices = np.asarray(prices, dtype=float)
+    drawdown = prices / np.maximum.accumulate(prices, axis=0) - 1
+    return drawdown.min(axis=0)
+
+
+def analyze(prices, weights=None, benchmark=None, interval="1d", window=ROLLING_WINDOW):
+    """Portfolio statistics for an aligned price matrix.
+
+    prices is a DataFrame with one column per ticker, benchmark an optional
+    price Series on the same index. Returns a dict with:
+    - "summary": annualized return and volatility, beta and max drawdown for
+      every ticker and for the weighted portfolio,
+    - "correlation": the correlation matrix of the tickers' returns,
+    - "equity": the portfolio value (starting at 1) and its rolling volatility.
+    """
+    annualization = periods_per_year(interval)
+    values = prices.to_numpy(dtype=float)
+    weights = normalize_weights(weights, values.shape[1])
+
+    returns = simple_returns(values)
+    portfolio = returns @ weights  # rebalanced to the weights every bar
+    all_returns = np.column_stack((returns, portfolio))
+    equity = np.concatenate(([1.0], np.cumprod(1 + portfolio)))
+    all_prices = np.column_stack((values / values[0], equity))
+
+    n = len(returns)
+    growth = np.prod(1 + all_returns, axis=0)
+    summary = pd.DataFrame(
+        {
+            "Weight": np.append(weights, weights.sum()),
+            "Annual return": growth ** (annualization / max(n, 1)) - 1,
+            "Annual volatility": all_returns.std(axis=0, ddof=1) * np.sqrt(annualization),
+            "Max drawdown": max_drawdowns(all_prices),
+        },
+        index=list(prices.columns) + ["Portfolio"],
+    )
+    if benchmark is not None:
+        summary["Beta"] = betas(all_returns, simple_returns(benchmark.to_numpy(dtype=float)))
+
+    correlation = pd.DataFrame(
+        np.corrcoef(returns, rowvar=False).reshape(values.shape[1], values.shape[1]),
+        index=prices.columns,
+        columns=prices.columns,
+    )
+
+    volatility = rolling_volatility(portfolio, window, annualization)[:, 0]
+    equity = pd.DataFrame(
+        {"Equity": equity, "Rolling volatility": np.concatenate(([np.nan], volatility))},
+        index=prices.index,
+    )
+
+    return {"summary": summary, "correlation": correlation, "equity": equity}
@@ -0,0 +1,117 @@
+import time
+import datetime
+import threading
+from collections import Counter
+from zoneinfo import ZoneInfo
+
+# ---- BACKGROUND PREFETCH ----
+# Keeps the calls behind the most viewed page sections warm in the shared
+# cache, with the arguments the page calls them with. A view is a tuple
+# (kind, tickers, *arguments) recorded by the page for a section it showed;
+# the hot set is the default views plus the most requested ones. Views are
+# refreshed often while the market of one of their tickers is open and
+# rarely once they have all closed.
+
+HOT_SET_SIZE = 20  # defaults included
+OPEN_INTERVAL = 60  # seconds between refreshes while the market is open
+CLOSED_INTERVAL = 3600  # seconds between refreshes once it has closed
+TICK = 5  # seconds between scheduler passes
+
+# Trading hours in the exchange's local time (holidays are not taken into account)
+MARKET_HOURS = {
+    "NSE": ("Asia/Kolkata", datetime.time(9, 15), datetime.time(15, 30)),
+    "US": ("America/New_York", datetime.time(9, 30), datetime.time(16, 0)),
+    "JPX": ("Asia/Tokyo", datetime.time(9, 0), datetime.time(15, 30)),
+    "XETRA": ("Europe/Berlin", datetime.time(9, 0), datetime.time(17, 30)),
+}
+
+
+def exchange_of(ticker):
+    if ticker.endswith((".NS", ".BO")) or ticker in ["^NSEI", "^BSESN"]:
+        return "NSE"
+    if ticker.endswith(".T") or ticker == "^N225":
+        return "JPX"
+    if ticker.endswith(".DE") or ticker == "^GDAXI":
+        return "XETRA"
+    return "US"
+
+
+def is_market_open(ticker, now=None):
+    tz, open_time, close_time = MARKET_HOURS[exchange_of(ticker)]
+    local = (now or datetime.datetime.now(datetime.timezone.utc)).astimezone(ZoneInfo(tz))
+    return local.weekday() < 5 and open_time <= local.time() <= close_time
+
+
+def seconds_until_open(ticker, now=None):
+    """Seconds until the market of ticker next opens, 0 while it is open."""
+    if is_market_open(ticker, now):
+        return 0
+    tz, open_time, _ = MARKET_HOURS[exchange_of(ticker)]
+    local = (now or datetime.datetime.now(datetime.timezone.utc)).astimezone(ZoneInfo(tz))
+    day = local.date()
+    if local.time() >= open_time:
+        day += datetime.timedelta(days=1)
+    while day.weekday() >= 5:
+        day += datetime.timedelta(days=1)
+    opens = datetime.datetime.combine(day, open_time, tzinfo=ZoneInfo(tz))
+    return (opens - local).total_seconds()
+
+
+def is_view_open(view, now=None):
+    return any(is_market_open(ticker, now) for ticker in view[1])
+
+
+class Prefetcher:
+    """Background scheduler refreshing the hot set through warm(view, market_open)."""
+
+    def __init__(self, warm, defaults=(), size=HOT_SET_SIZE,
+                 open_interval=OPEN_INTERVAL, closed_interval=CLOSED_INTERVAL):
+        self.warm = warm
+        self.defaults = list(defaults)
+        self.size = size
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self.accesses = Counter()
+        self.errors = Counter()
+        self._due = {}  # view -> monotonic time of the next refresh
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def record(self, views):
+        """Counts the views shown, the most requested ones join the hot set."""
+        with self._lock:
+            self.accesses.update(views)
+
+    def hot_set(self):
+        with self._lock:
+            popular = [t for t, _ in self.accesses.most_common(self.size)]
+        hot = list(dict.fromkeys(self.defaults + popular))
+        return hot[:max(self.size, len(self.defaults))]
+
+    def run_pending(self, now=None):
+        """Refreshes the hot views that are due, returns how many were."""
+        now = time.monotonic() if now is None else now
+        refreshed = 0
+        for view in self.hot_set():
+            if self._due.get(view, 0) > now:
+                continue
+            market_open = is_view_open(view)
+            try:
+                self.warm(view, market_open)
+            except Exception:
+                self.errors[view] += 1
+            interval = self.open_interval if market_open else self.closed_interval
+            self._due[view] = now + interval
+            refreshed += 1
+        return refreshed
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.run_pending()
+            time.sleep(TICK)
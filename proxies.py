@@ -0,0 +1,170 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import transport
+
+# ---- PROXY POOL ----
+# Proxies are scraped and probed by a background thread, so acquiring one never
+# blocks a request. Each proxy keeps a latency and success-rate score, is picked
+# by weighted choice, is ejected as soon as it fails, and owns a keep-alive
+# requests.Session.
+
+POOL_SIZE = 10  # healthy proxies to keep around
+CHECK_URL = "https://finance.yahoo.com"
+CHECK_TIMEOUT = 2  # seconds, slower proxies are not admitted
+REFILL_INTERVAL = 30  # seconds between refill rounds when the pool is full
+CHECK_WORKERS = 16
+
+
+def free_proxy_candidates():
+    """Unchecked proxy addresses from the free-proxy lists."""
+    from fp.fp import FreeProxy  # only needed once the pool starts filling
+
+    return [f"http://{address}" for address in FreeProxy().get_proxy_list(repeat=False)]
+
+
+# Connection failures of requests, urllib3 and curl_cffi (used by yfinance),
+# matched by name since they don't share a base class
+PROXY_FAILURES = {"ConnectionError", "ProxyError", "Timeout", "ConnectTimeout", "ReadTimeout", "TimeoutError"}
+
+
+def is_proxy_failure(exc):
+    """Whether an error means the proxy itself failed, rather than the request."""
+    return any(cls.__name__ in PROXY_FAILURES for cls in type(exc).__mro__)
+
+
+class Proxy:
+    def __init__(self, address, latency):
+        self.address = address
+        self.latency = latency  # moving average, in seconds
+        self.successes = 0
+        self.failures = 0
+        self.session = transport.make_session()
+        self.session.proxies = {"http": address, "https": address}
+
+    @property
+    def proxies(self):
+        # yfinance and the pages are fetched over https, through the same proxy
+        return {"http": self.address, "https": self.address}
+
+    @property
+    def score(self):
+        # Laplace-smoothed success rate per second of latency
+        rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        return rate / max(self.latency, 0.01)
+
+    def record(self, ok, latency=None):
+        if ok:
+            self.successes += 1
+        else:
+            self.failures += 1
+        if latency is not None:
+            self.latency = 0.8 * self.latency + 0.2 * latency
+
+
+class ProxyPool:
+    """Background-filled pool of health-checked proxies."""
+
+    def __init__(self, source=free_proxy_candidates, size=POOL_SIZE,
+                 check_url=CHECK_URL, check_timeout=CHECK_TIMEOUT):
+        self.source = source
+        self.size = size
+        self.check_url = check_url
+        self.check_timeout = check_timeout
+        self.ejected = 0
+        self._proxies = {}  # address -> Proxy
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._proxies)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="proxy-pool", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            if len(self) < self.size:
+                try:
+                    self.fill()
+                except Exception:
+                    pass
+            self._wake.wait(REFILL_INTERVAL)
+            self._wake.clear()
+
+    def probe(self, address):
+        """Latency of a request through the proxy, None if it doesn't work."""
+        proxies = {"http": address, "https": address}
+        start = time.perf_counter()
+        try:
+            response = requests.get(self.check_url, proxies=proxies, timeout=self.check_timeout)
+            if response.ok:
+                return time.perf_counter() - start
+        except requests.exceptions.RequestException:
+            pass
+        return None
+
+    def fill(self):
+        """Probes fresh candidates and adds the working ones to the pool."""
+        with self._lock:
+            known = set(self._proxies)
+        candidates = [address for address in self.source() if address not in known]
+        random.shuffle(candidates)
+
+        with ThreadPoolExecutor(max_workers=CHECK_WORKERS) as executor:
+            for address, latency in zip(candidates, executor.map(self.probe, candidates)):
+                if latency is None:
+                    continue
+                with self._lock:
+                    if len(self._proxies) >= self.size:
+                        break
+                    self._proxies[address] = Proxy(address, latency)
+
+    def acquire(self):
+        """Returns a proxy picked by score, or None while the pool is empty."""
+        self.start()
+        with self._lock:
+            proxies = list(self._proxies.values())
+        if len(proxies) < self.size:
+            self._wake.set()
+        if not proxies:
+            return None
+        return random.choices(proxies, weights=[p.score for p in proxies])[0]
+
+    def report(self, address, ok, latency=None):
+        """Records the outcome of a request made through a proxy."""
+        with self._lock:
+            proxy = self._proxies.get(address)
+            if proxy is None:
+                return
+            proxy.record(ok, latency)
+            if not ok:
+                del self._proxies[address]
+                self.ejected += 1
+        if not ok:
+            proxy.session.close()
+            self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    "address": p.address,
+                    "latency": p.latency,
+                    "successes": p.successes,
+                    "failures": p.failures,
+                    "score": p.score,
+                }
+                for p in self._proxies.values()
+            ]
+
+
+proxy_pool = ProxyPool()
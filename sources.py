@@ -0,0 +1,258 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+
+import pandas as pd
+import requests
+
+import store
+import transport
+
+# ---- DATA SOURCES ----
+# The upstream calls behind fetch_info, fetch_history, fetch_batch,
+# fetch_splits and fetch_table. Caching, proxies and retries stay in
+# functions.py, so swapping the source keeps every other code path the same:
+# - YahooSource calls Yahoo Finance and the NSE/BSE pages,
+# - RecordingSource passes calls through to another source and saves the
+#   responses under a directory,
+# - ReplaySource serves those files with a configurable latency and error rate.
+# The source is picked with the DATA_SOURCE environment variable ("yahoo",
+# "record" or "replay") or with use().
+
+RECORDINGS_DIR = os.environ.get("RECORDINGS_DIR", os.path.join("data", "recordings"))
+
+
+class YahooSource:
+    """The live upstreams.
+
+    yfinance is imported on the first call, so replays and the rest of the
+    app start without it.
+    """
+
+    uses_proxies = True
+
+    def info(self, ticker, proxy=None):
+        import yfinance as yf
+        return yf.Ticker(ticker, proxy=proxy).info
+
+    def history(self, ticker, period="3mo", interval="1d", start=None, proxy=None):
+        import yfinance as yf
+        ticker = yf.Ticker(ticker, proxy=proxy)
+        if start:
+            return ticker.history(start=start, interval=interval)
+        return ticker.history(period=period, interval=interval)
+
+    def download(self, tickers, period="3mo", interval="1d", start=None, proxy=None):
+        """History of several tickers, with (Ticker, Price) columns."""
+        import yfinance as yf
+        if start:
+            return yf.download(tickers, start=start, interval=interval, group_by="ticker",
+                               auto_adjust=True, actions=True, progress=False, proxy=proxy)
+        return yf.download(tickers, period=period, interval=interval, group_by="ticker",
+                           auto_adjust=True, actions=True, progress=False, proxy=proxy)
+
+    def splits(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).splits
+
+    def page(self, url, session=None):
+        return transport.get(url, session=session).text
+
+
+def _name(value):
+    return re.sub(r"[^\w.^=-]", "_", value)
+
+
+def _paths(directory, kind, key, interval=None):
+    folder = os.path.join(directory, kind, interval) if interval else os.path.join(directory, kind)
+    if kind == "pages":
+        name = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(folder, f"{name}.html")
+    if kind == "info":
+        return os.path.join(folder, f"{_name(key)}.json")
+    return os.path.join(folder, f"{_name(key)}.parquet")
+
+
+def _slice(hist, period="3mo", start=None):
+    # Bars of a recorded history covered by a period (counted back from the
+    # last recorded bar, so replays don't depend on today's date) or a start
+    if hist.empty:
+        return hist
+    if start:
+        first = pd.Timestamp(start)
+        if hist.index.tz is not None and first.tz is None:
+            first = first.tz_localize(hist.index.tz)
+    else:
+        first = store.period_start(period, hist.index[-1])
+    return hist if first is None else hist[hist.index >= first]
+
+
+class RecordingSource:
+    """Passes calls through to source and saves the responses for ReplaySource.
+
+    Histories are kept per ticker and interval, merged across calls, so a
+    replay can serve any period or start they cover.
+    """
+
+    def __init__(self, source=None, directory=RECORDINGS_DIR):
+        self.source = source or YahooSource()
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    @property
+    def uses_proxies(self):
+        return self.source.uses_proxies
+
+    def _write(self, path, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        store._replace(path, write)
+
+    def _record_history(self, ticker, interval, hist):
+        if hist.empty:
+            return
+        path = _paths(self.directory, "history", ticker, interval)
+        with self._lock:
+            if os.path.exists(path):
+                old = pd.read_parquet(path)
+                hist = pd.concat([old[~old.index.isin(hist.index)], hist]).sort_index()
+            self._write(path, hist.to_parquet)
+
+    def info(self, ticker, proxy=None):
+        info = self.source.info(ticker, proxy=proxy)
+        path = _paths(self.directory, "info", ticker)
+
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump(info, f, default=str)
+
+        self._write(path, write)
+        return info
+
+    def history(self, ticker, period="3mo", interval="1d", start=None, proxy=None):
+        hist = self.source.history(ticker, period=period, interval=interval, start=start, proxy=proxy)
+        self._record_history(ticker, interval, hist)
+        return hist
+
+    def download(self, tickers, period="3mo", interval="1d", start=None, proxy=None):
+        data = self.source.download(tickers, period=period, interval=interval, start=start, proxy=proxy)
+        for ticker in tickers:
+            hist = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+            self._record_history(ticker, interval, hist.dropna(how="all"))
+        return data
+
+    def splits(self, ticker):
+        splits = self.source.splits(ticker)
+        self._write(_paths(self.directory, "splits", ticker), splits.to_frame().to_parquet)
+        return splits
+
+    def page(self, url, session=None):
+        text = self.source.page(url, session=session)
+
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+
+        self._write(_paths(self.directory, "pages", url), write)
+        return text
+
+
+class ReplaySource:
+    """Serves the responses saved by RecordingSource from local files.
+
+    Every call waits latency seconds plus up to jitter more, then fails with a
+    connection error with probability error_rate, so upstream speed and
+    reliability are under control. Calls without a recording raise LookupError.
+    """
+
+    uses_proxies = False
+
+    def __init__(self, directory=RECORDINGS_DIR, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _upstream(self, what):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(delay)
+        if failed:
+            raise requests.exceptions.ConnectionError(f"Injected error for {what}")
+
+    def _path(self, kind, key, interval=None):
+        path = _paths(self.directory, kind, key, interval)
+        if not os.path.exists(path):
+            raise LookupError(f"No recording of {kind} for {key}")
+        return path
+
+    def info(self, ticker, proxy=None):
+        self._upstream(ticker)
+        with open(self._path("info", ticker)) as f:
+            return json.load(f)
+
+    def history(self, ticker, period="3mo", interval="1d", start=None, proxy=None):
+        self._upstream(ticker)
+        hist = pd.read_parquet(self._path("history", ticker, interval))
+        return _slice(hist, period, start)
+
+    def download(self, tickers, period="3mo", interval="1d", start=None, proxy=None):
+        self._upstream(", ".join(tickers))
+        # Like yf.download, tickers without data are left out rather than
+        # failing the batch
+        histories = {}
+        for ticker in tickers:
+            path = _paths(self.directory, "history", ticker, interval)
+            if os.path.exists(path):
+                histories[ticker] = _slice(pd.read_parquet(path), period, start)
+        if not histories:
+            raise LookupError(f"No recording of history for {', '.join(tickers)}")
+        return pd.concat(histories, axis=1, names=["Ticker", "Price"])
+
+    def splits(self, ticker):
+        self._upstream(ticker)
+        return pd.read_parquet(self._path("splits", ticker)).iloc[:, 0]
+
+    def page(self, url, session=None):
+        self._upstream(url)
+        with open(self._path("pages", url), encoding="utf-8") as f:
+            return f.read()
+
+
+def from_env():
+    kind = os.environ.get("DATA_SOURCE", "yahoo")
+    if kind == "record":
+        return RecordingSource()
+    if kind == "replay":
+        return ReplaySource(
+            latency=float(os.environ.get("REPLAY_LATENCY", 0)),
+            jitter=float(os.environ.get("REPLAY_JITTER", 0)),
+            error_rate=float(os.environ.get("REPLAY_ERROR_RATE", 0)),
+            seed=os.environ.get("REPLAY_SEED"),
+        )
+    return YahooSource()
+
+
+_source = from_env()
+
+
+def current():
+    return _source
+
+
+def use(source):
+    """Switches the data source, returns the previous one."""
+    global _source
+    previous, _source = _source, source
+    return previous
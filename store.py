@@ -0,0 +1,208 @@
+import os
+import json
+import tempfile
+import threading
+
+import pandas as pd
+
+# ---- ON-DISK OHLCV STORE ----
+# One Parquet file per ticker and interval, plus a small JSON file recording how
+# far back the stored history goes. A refresh only downloads the bars after the
+# last stored timestamp and appends them. Refreshes of one ticker and
+# interval are serialized by a lock per file, and files are replaced
+# atomically, so concurrent fetches of different periods can't mix up writes.
+
+STORE_DIR = os.path.join("data", "ohlcv")
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+INTERVAL_DURATIONS = {
+    "1m": pd.Timedelta(minutes=1),
+    "2m": pd.Timedelta(minutes=2),
+    "5m": pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+    "30m": pd.Timedelta(minutes=30),
+    "60m": pd.Timedelta(hours=1),
+    "90m": pd.Timedelta(minutes=90),
+    "1h": pd.Timedelta(hours=1),
+    "1d": pd.Timedelta(days=1),
+    "5d": pd.Timedelta(days=5),
+    "1wk": pd.Timedelta(weeks=1),
+    "1mo": pd.Timedelta(days=30),
+    "3mo": pd.Timedelta(days=90),
+}
+
+# How far back Yahoo serves bars of an interval. A store whose last bar is
+# older than that can't be caught up with the bars after it
+UPSTREAM_LOOKBACK = {
+    "1m": pd.Timedelta(days=30),
+    "2m": pd.Timedelta(days=60),
+    "5m": pd.Timedelta(days=60),
+    "15m": pd.Timedelta(days=60),
+    "30m": pd.Timedelta(days=60),
+    "90m": pd.Timedelta(days=60),
+    "60m": pd.Timedelta(days=730),
+    "1h": pd.Timedelta(days=730),
+}
+
+# The last bar of a series keeps changing until it closes, so the store is
+# considered fresh for at most one bar and never longer than this
+MAX_STALENESS = pd.Timedelta(minutes=1)
+
+
+def _paths(ticker, interval):
+    folder = os.path.join(STORE_DIR, interval)
+    name = ticker.replace("/", "_")
+    return os.path.join(folder, f"{name}.parquet"), os.path.join(folder, f"{name}.json")
+
+
+def period_start(period, now):
+    """Returns the first timestamp covered by a yfinance period (None for max)."""
+    if period == "max":
+        return None
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    return now - PERIOD_OFFSETS[period]
+
+
+def read(ticker, interval):
+    """Returns the stored history and its metadata, or (None, {}) if missing."""
+    data_path, meta_path = _paths(ticker, interval)
+    if not os.path.exists(data_path) or not os.path.exists(meta_path):
+        return None, {}
+    try:
+        hist = pd.read_parquet(data_path)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return hist, meta
+    except Exception:
+        return None, {}
+
+
+_locks = {}  # data path -> lock held while the file is read, merged and written
+_locks_lock = threading.Lock()
+
+
+def lock_for(ticker, interval):
+    data_path, _ = _paths(ticker, interval)
+    with _locks_lock:
+        if data_path not in _locks:
+            _locks[data_path] = threading.RLock()
+        return _locks[data_path]
+
+
+def _replace(path, write):
+    # Written to a temporary file of its own first, so readers never see a
+    # partial file and concurrent writers never share one
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def write(ticker, interval, hist, meta):
+    data_path, meta_path = _paths(ticker, interval)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+    def write_meta(tmp):
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+
+    with lock_for(ticker, interval):
+        _replace(data_path, hist.to_parquet)
+        _replace(meta_path, write_meta)
+
+
+def append(stored, delta):
+    # The last stored bar may have been incomplete, newer values win
+    hist = pd.concat([stored, delta])
+    hist = hist[~hist.index.duplicated(keep="last")]
+    return hist.sort_index()
+
+
+def is_fresh(meta, interval):
+    updated = meta.get("updated")
+    if updated is None:
+        return False
+    age = pd.Timestamp.now(tz="UTC") - pd.Timestamp(updated)
+    return age < min(INTERVAL_DURATIONS.get(interval, MAX_STALENESS), MAX_STALENESS)
+
+
+def load_history(ticker, period, interval, download):
+    """Returns the history of a ticker, served from disk where possible.
+
+    download(period=..., start=...) must return the history frame from the
+    upstream source. It is called with the requested period when the store
+    doesn't cover it yet, and with the last stored timestamp otherwise. When
+    the bars after that timestamp can't be had (the gap is longer than
+    upstream keeps, or the call fails), the whole period is downloaded again.
+    """
+    # Held from the read to the write, so a concurrent refresh of the same
+    # file (another period of the ticker) can't drop the bars this one adds
+    with lock_for(ticker, interval):
+        return _load_history(ticker, period, interval, download)
+
+
+def _download_period(ticker, period, interval, download):
+    # The whole period from upstream, replacing what the store had
+    hist = download(period=period)
+    if hist.empty:
+        return hist
+    now = pd.Timestamp.now(tz=hist.index.tz)
+    start = period_start(period, now)
+    meta = {
+        "period": period,
+        "start": None if start is None else start.isoformat(),
+        "updated": pd.Timestamp.now(tz="UTC").isoformat(),
+    }
+    write(ticker, interval, hist, meta)
+    return hist
+
+
+def _load_history(ticker, period, interval, download):
+    hist, meta = read(ticker, interval)
+
+    covered = False
+    if hist is not None and not hist.empty:
+        now = pd.Timestamp.now(tz=hist.index.tz)
+        start = period_start(period, now)
+        stored_start = meta.get("start")
+        if stored_start is None:
+            covered = meta.get("period") == "max"
+        else:
+            covered = start is not None and start >= pd.Timestamp(stored_start)
+
+    if not covered:
+        return _download_period(ticker, period, interval, download)
+
+    # Only ask upstream for the bars after the last stored one
+    if not is_fresh(meta, interval):
+        lookback = UPSTREAM_LOOKBACK.get(interval)
+        if lookback is not None and now - hist.index[-1] > lookback:
+            return _download_period(ticker, period, interval, download)
+        try:
+            delta = download(start=hist.index[-1])
+        except Exception:
+            return _download_period(ticker, period, interval, download)
+        if not delta.empty:
+            hist = append(hist, delta)
+        meta["updated"] = pd.Timestamp.now(tz="UTC").isoformat()
+        write(ticker, interval, hist, meta)
+
+    if start is not None:
+        hist = hist[hist.index >= start]
+    return hist
@@ -0,0 +1,182 @@
+import os
+import glob
+import bisect
+import threading
+
+import pandas as pd
+
+import transport
+
+# ---- SYMBOL MASTER ----
+# Exchange listings loaded from local files into sorted arrays, so symbols are
+# validated and completed with a binary search instead of a network call.
+# Supported files in LISTINGS_DIR:
+# - EQUITY_L.csv, the NSE equity list (symbols get the .NS suffix),
+# - Equity.csv, the BSE scrip list exported from bseindia.com (.BO suffix),
+# - nasdaqlisted.txt and otherlisted.txt, the US lists from nasdaqtrader.com,
+# - any other *.csv with symbol, name, exchange and quoteType columns, such
+#   as indices.csv.
+# download_listings() fetches the NSE and US files.
+
+LISTINGS_DIR = "listings"
+SUGGESTIONS = 10
+
+LISTING_URLS = {
+    "EQUITY_L.csv": "https://nsearchives.nseindia.com/content/equities/EQUITY_L.csv",
+    "nasdaqlisted.txt": "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt",
+    "otherlisted.txt": "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt",
+}
+
+US_EXCHANGES = {"A": "NYSE American", "N": "NYSE", "P": "NYSE Arca", "Z": "Cboe BZX", "V": "IEX"}
+COLUMNS = ["symbol", "name", "exchange", "quoteType"]
+
+
+def _yahoo_us(symbol):
+    # Share classes are written BRK.B in the lists and BRK-B on Yahoo
+    return symbol.replace(".", "-")
+
+
+def read_nse(path):
+    df = pd.read_csv(path, dtype=str).rename(columns=str.strip)
+    return pd.DataFrame({
+        "symbol": df["SYMBOL"].str.strip() + ".NS",
+        "name": df["NAME OF COMPANY"].str.strip(),
+        "exchange": "NSE",
+        "quoteType": "EQUITY",
+    })
+
+
+def read_bse(path):
+    df = pd.read_csv(path, dtype=str).rename(columns=str.strip)
+    df = df[(df["Status"].str.strip() == "Active") & (df["Instrument"].str.strip() == "Equity")]
+    return pd.DataFrame({
+        "symbol": df["Security Id"].str.strip() + ".BO",
+        "name": df["Security Name"].str.strip(),
+        "exchange": "BSE",
+        "quoteType": "EQUITY",
+    })
+
+
+def read_nasdaq(path):
+    df = pd.read_csv(path, sep="|", dtype=str)
+    df = df[df["Test Issue"] == "N"]  # also drops the trailing "File Creation Time" row
+    return pd.DataFrame({
+        "symbol": df["Symbol"].map(_yahoo_us),
+        "name": df["Security Name"],
+        "exchange": "NASDAQ",
+        "quoteType": df["ETF"].map({"Y": "ETF"}).fillna("EQUITY"),
+    })
+
+
+def read_other(path):
+    df = pd.read_csv(path, sep="|", dtype=str)
+    df = df[(df["Test Issue"] == "N") & ~df["ACT Symbol"].str.contains(r"\$", regex=True)]
+    return pd.DataFrame({
+        "symbol": df["ACT Symbol"].map(_yahoo_us),
+        "name": df["Security Name"],
+        "exchange": df["Exchange"].map(US_EXCHANGES).fillna(df["Exchange"]),
+        "quoteType": df["ETF"].map({"Y": "ETF"}).fillna("EQUITY"),
+    })
+
+
+READERS = {
+    "EQUITY_L.csv": read_nse,
+    "Equity.csv": read_bse,
+    "nasdaqlisted.txt": read_nasdaq,
+    "otherlisted.txt": read_other,
+}
+
+
+def read_listing(path):
+    reader = READERS.get(os.path.basename(path))
+    if reader is not None:
+        return reader(path)
+    return pd.read_csv(path, dtype=str)[COLUMNS]
+
+
+class SymbolMaster:
+    """Listed symbols with prefix search on the symbol and on the name."""
+
+    def __init__(self, listings):
+        listings = listings.dropna(subset=["symbol"]).fillna("")
+        listings = listings.drop_duplicates("symbol", keep="first")
+        self._entries = {
+            row.symbol.upper(): row._asdict()
+            for row in listings[COLUMNS].itertuples(index=False)
+        }
+        # Sorted keys for bisect, names point back to their symbol
+        self._symbols = sorted(self._entries)
+        names = sorted((e["name"].upper(), s) for s, e in self._entries.items() if e["name"])
+        self._names = [name for name, _ in names]
+        self._name_symbols = [symbol for _, symbol in names]
+
+    @classmethod
+    def load(cls, directory=LISTINGS_DIR):
+        paths = sorted(glob.glob(os.path.join(directory, "*.csv")) +
+                       glob.glob(os.path.join(directory, "*.txt")))
+        frames = []
+        for path in paths:
+            try:
+                frames.append(read_listing(path))
+            except Exception:
+                pass  # a malformed file only loses its own symbols
+        return cls(pd.concat(frames) if frames else pd.DataFrame(columns=COLUMNS))
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self._entries
+
+    def get(self, symbol):
+        """symbol, name, exchange and quoteType of a listed symbol, None if unknown."""
+        return self._entries.get(symbol.upper())
+
+    @staticmethod
+    def _prefixed(keys, prefix):
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\uffff", lo=start)
+        return start, end
+
+    def suggest(self, prefix, limit=SUGGESTIONS):
+        """Entries whose symbol, then whose name, starts with prefix."""
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return []
+        start, end = self._prefixed(self._symbols, prefix)
+        found = self._symbols[start:min(end, start + limit)]
+        if len(found) < limit:
+            start, end = self._prefixed(self._names, prefix)
+            for symbol in self._name_symbols[start:end]:
+                if len(found) == limit:
+                    break
+                if symbol not in found:
+                    found.append(symbol)
+        return [self._entries[symbol] for symbol in found]
+
+
+def download_listings(directory=LISTINGS_DIR):
+    """Fetches the NSE and US listing files (the BSE list has to be exported by hand)."""
+    os.makedirs(directory, exist_ok=True)
+    for name, url in LISTING_URLS.items():
+        response = transport.get(url)
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(response.content)
+
+
+_master = None
+_lock = threading.Lock()
+
+
+def symbol_master():
+    """The master loaded from LISTINGS_DIR, read once on first use."""
+    global _master
+    with _lock:
+        if _master is None:
+            _master = SymbolMaster.load()
+        return _master
+
+
+if __name__ == "__main__":
+    download_listings()
+    print(f"{len(SymbolMaster.load())} symbols")
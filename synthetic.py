@@ -0,0 +1,103 @@
+import time
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import sources
+
+# ---- SYNTHETIC DATA ----
+# Made-up market data shared by the tests and the benchmarks, so neither of
+# them ever leaves the machine:
+# - ohlcv() draws seeded random-walk bars,
+# - daily() draws a ticker's daily bars up to today,
+# - SyntheticSource serves them in place of the upstreams (see sources.py).
+
+BARS = 300
+
+INFO = {
+    "quoteType": "EQUITY", "shortName": "Synthetic", "country": "India",
+    "exchange": "NSI", "sector": "Consumer Cyclical", "industry": "Auto Manufacturers",
+    "marketCap": 3_000_000_000_000, "currency": "INR", "beta": 1.2, "currentPrice": 1000.0,
+}
+
+# One table with the columns of both the NSE and the BSE pages
+MOVER_COLUMNS = ["Symbol", "Company", "Last", "Close", "Change", "% Change", "%Change"]
+TOP_MOVERS = pd.DataFrame(
+    [[f"SYM{i}", f"SYM{i}", 100.0 + i, 100.0 + i, i / 10, i / 10, i / 10] for i in range(10)],
+    columns=MOVER_COLUMNS,
+)
+TOP_MOVERS_HTML = TOP_MOVERS.to_html(index=False)
+
+
+def ohlcv(n, seed=0, start=None, end=None, freq="min", volatility=0.01):
+    """n bars of a random walk from start or up to end (by default today)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    spread = np.abs(rng.normal(0, volatility, n)) * close
+    if start is None and end is None:
+        end = pd.Timestamp.now(tz="UTC").normalize()
+    return pd.DataFrame(
+        {
+            "Open": np.roll(close, 1),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000, 100_000, n),
+        },
+        index=pd.date_range(start=start, end=end, periods=n, freq=freq),
+    )
+
+
+def daily(ticker, n=BARS):
+    """n daily bars of a random walk up to today, seeded by the ticker."""
+    bars = ohlcv(n, seed=sum(map(ord, ticker)), freq="B")
+    return bars.assign(**{"Dividends": 0.0, "Stock Splits": 0.0})
+
+
+def info(ticker):
+    return dict(INFO, quoteType="INDEX" if ticker.startswith("^") else "EQUITY", shortName=ticker)
+
+
+class SyntheticSource:
+    """Data source serving bars(ticker), info(ticker) and a top movers page.
+
+    Calls are counted per method and ticker, and every call takes delay
+    seconds, so concurrent callers overlap.
+    """
+
+    uses_proxies = False
+
+    def __init__(self, bars=daily, info=info, delay=0.0):
+        self.bars = bars
+        self._info = info
+        self.delay = delay
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _call(self, method, key):
+        with self._lock:
+            self.calls[(method, key)] += 1
+        time.sleep(self.delay)
+
+    def info(self, ticker, proxy=None):
+        self._call("info", ticker)
+        return self._info(ticker)
+
+    def history(self, ticker, period="3mo", interval="1d", start=None, proxy=None):
+        self._call("history", ticker)
+        return sources._slice(self.bars(ticker), period, start)
+
+    def download(self, tickers, period="3mo", interval="1d", start=None, proxy=None):
+        self._call("download", tuple(tickers))
+        return pd.concat({t: sources._slice(self.bars(t), period, start) for t in tickers},
+                         axis=1, names=["Ticker", "Price"])
+
+    def splits(self, ticker):
+        self._call("splits", ticker)
+        return pd.Series(dtype=float, name="Stock Splits")
+
+    def page(self, url, session=None):
+        self._call("page", url)
+        return TOP_MOVERS_HTML
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store  # noqa: E402
+import sources  # noqa: E402
+from cache import market_cache, figure_cache  # noqa: E402
+from synthetic import SyntheticSource  # noqa: E402
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    """A SyntheticSource in place of the upstreams, with empty caches and store."""
+    fake = SyntheticSource()
+    previous = sources.use(fake)
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path / "ohlcv"))
+    market_cache.invalidate(prefix=())
+    figure_cache.invalidate(prefix=())
+    yield fake
+    sources.use(previous)
+    market_cache.invalidate(prefix=())
+    figure_cache.invalidate(prefix=())
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+import backtest
+import functions
+
+
+def test_backtest_fetchers_are_cached(source):
+    backtest = functions.fetch_backtest("AAA", "SMA crossover", period="1y", interval="1d")
+    sweep = functions.fetch_sweep("AAA", period="1y", interval="1d")
+    assert not isinstance(backtest, Exception)
+    assert not isinstance(sweep, Exception)
+    calls = sum(source.calls.values())
+
+    functions.fetch_backtest("AAA", "SMA crossover", period="1y", interval="1d")
+    functions.fetch_sweep("AAA", period="1y", interval="1d")
+    assert sum(source.calls.values()) == calls
+
+
+def test_positions_are_held_from_one_close_to_the_next_and_pay_for_trades():
+    close = [100, 110, 99, 99]
+    positions = [1, 1, 0, 0]
+    # Bought on the first close: +10% less the entry cost, then -10%, then the
+    # exit cost on the third close and nothing held on the last bar
+    expected = [0.1 - 0.01, -0.1, -0.01]
+    assert np.allclose(backtest.strategy_returns(close, positions, cost=0.01), expected)
+    # Rows of a 2-D position matrix are independent strategies
+    both = backtest.strategy_returns(close, [positions, [0, 0, 0, 0]], cost=0.01)
+    assert np.allclose(both, [expected, [0, 0, 0]])
+
+
+def wave(n=300):
+    t = np.arange(n)
+    return 100 + 10 * np.sin(t / 15) + t / 10
+
+
+def test_crossover_positions_match_rolling_means():
+    close = wave()
+    series = pd.Series(close)
+    expected = (series.rolling(10).mean() > series.rolling(30).mean()).astype(float)
+    assert np.array_equal(backtest.crossover_positions(close, fast=10, slow=30), expected.to_numpy())
+
+
+def smooth(values, alpha):
+    # EMA started from the first value, one bar at a time
+    out, average = [], None
+    for value in values:
+        average = value if average is None else average + alpha * (value - average)
+        out.append(average)
+    return np.array(out)
+
+
+def test_rsi_positions_enter_below_lower_and_exit_above_upper():
+    close = wave()
+    delta = np.diff(close)
+    gains = smooth(np.clip(delta, 0, None), 1 / 14)
+    losses = smooth(np.clip(-delta, 0, None), 1 / 14)
+    with np.errstate(divide="ignore"):
+        rsi = 100 - 100 / (1 + gains / losses)  # 100 while nothing was lost
+    expected, held = [0.0], 0.0  # nothing is known on the first bar
+    for value in rsi:
+        held = 1.0 if value < 30 else 0.0 if value > 70 else held
+        expected.append(held)
+
+    positions = backtest.rsi_positions(close)
+    assert np.array_equal(positions, expected)
+    assert 0 < positions.mean() < 1
+
+
+def test_macd_positions_match_the_signal_line():
+    close = wave()
+    macd = smooth(close, 2 / 13) - smooth(close, 2 / 27)
+    expected = (macd > smooth(macd, 2 / 10)).astype(float)
+    expected[:25] = 0
+
+    assert np.array_equal(backtest.macd_positions(close), expected)
+
+
+def test_sweep_matches_run_for_the_same_windows():
+    close = pd.Series(wave(), index=pd.bdate_range("2024-01-01", periods=300))
+    sweep = backtest.sweep(close, windows=[10, 30], workers=1)
+    stats = backtest.run(close, "SMA crossover", fast=10, slow=30)["stats"].loc["SMA crossover"]
+
+    assert list(sweep.index) == [(10, 30)]
+    assert np.allclose(sweep.loc[(10, 30)].to_numpy(dtype=float), stats.to_numpy(dtype=float))
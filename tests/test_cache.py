@@ -0,0 +1,123 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cache import TTLCache, cached
+from synthetic import daily
+
+
+def test_refresh_drops_only_the_given_call():
+    cache = TTLCache()
+    calls = []
+
+    @cached(3600, cache=cache)
+    def fetch(ticker, period="1y"):
+        calls.append((ticker, period))
+        return len(calls)
+
+    fetch("A")
+    fetch("B")
+    fetch.refresh("A", period="1y", min_age=0)
+    fetch("A")
+    fetch("B")
+
+    assert calls == [("A", "1y"), ("B", "1y"), ("A", "1y")]
+
+
+def test_refresh_keeps_young_entries():
+    cache = TTLCache()
+    calls = []
+
+    @cached(3600, cache=cache)
+    def fetch(ticker):
+        calls.append(ticker)
+        return ticker
+
+    fetch("A")
+    fetch.refresh("A", min_age=60)  # pressed right after the fetch
+    fetch("A")
+    time.sleep(0.01)
+    fetch.refresh("A", min_age=0.001)
+    fetch("A")
+
+    assert calls == ["A", "A"]
+
+
+def test_concurrent_misses_share_one_upstream_call(source):
+    import functions
+
+    source.delay = 0.2
+    tickers = ["AAA", "BBB", "CCC"]
+    barrier = threading.Barrier(60)
+    results = []
+
+    def session(i):
+        barrier.wait()
+        ticker = tickers[i % len(tickers)]
+        results.append((ticker, functions.fetch_info(ticker), functions.fetch_bars(ticker, "1y", "1d")))
+
+    with ThreadPoolExecutor(max_workers=60) as executor:
+        list(executor.map(session, range(60)))
+
+    assert len(results) == 60
+    for ticker, info, bars in results:
+        assert info["shortName"] == ticker
+        assert len(bars) > 200
+    for ticker in tickers:
+        assert source.calls[("info", ticker)] == 1
+        assert source.calls[("history", ticker)] == 1
+
+
+def test_late_miss_finds_the_finished_flight():
+    cache = TTLCache()
+    calls = []
+    release = threading.Event()
+
+    @cached(3600, cache=cache)
+    def fetch(ticker):
+        calls.append(ticker)
+        release.wait(5)
+        return ticker
+
+    leader = threading.Thread(target=fetch, args=("A",))
+    leader.start()
+    while not calls:
+        time.sleep(0.001)
+
+    # Missed while the leader was running, but only joins once it is done
+    original_lookup = cache.lookup
+    late = []
+
+    def late_lookup(key, count=True):
+        found, value, version = original_lookup(key, count)
+        if count and not found:
+            release.set()
+            leader.join(5)
+        return found, value, version
+
+    cache.lookup = late_lookup
+    late.append(fetch("A"))
+
+    assert late == ["A"]
+    assert calls == ["A"]
+
+
+def test_hits_cannot_change_the_entry():
+    cache = TTLCache()
+
+    @cached(3600, cache=cache)
+    def fetch(ticker):
+        return daily(ticker, n=5), {"shortName": ticker}
+
+    frame, info = fetch("A")
+    frame.iloc[0, 0] = 99
+    frame["Extra"] = 1.0
+    with pytest.raises(TypeError):
+        info["shortName"] = "B"
+
+    frame, info = fetch("A")
+    assert frame.iloc[0, 0] == daily("A", n=5).iloc[0, 0]
+    assert "Extra" not in frame
+    assert info["shortName"] == "A"
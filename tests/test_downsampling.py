@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+import functions
+from synthetic import ohlcv
+
+
+def test_buckets_aggregate_ohlc_and_volume():
+    df = ohlcv(10, start="2025-01-02 09:30", freq="min").assign(Dividends=np.nan, SMA_3=np.arange(10.0))
+    df.loc[df.index[5], "Dividends"] = 0.5
+
+    resampled = functions.resample_ohlc(df, max_points=3)
+
+    # Buckets of 4 bars, the last one shorter
+    buckets = [df.iloc[0:4], df.iloc[4:8], df.iloc[8:10]]
+    assert list(resampled.index) == [bucket.index[0] for bucket in buckets]
+    assert list(resampled["Open"]) == [bucket["Open"].iloc[0] for bucket in buckets]
+    assert list(resampled["High"]) == [bucket["High"].max() for bucket in buckets]
+    assert list(resampled["Low"]) == [bucket["Low"].min() for bucket in buckets]
+    assert list(resampled["Close"]) == [bucket["Close"].iloc[-1] for bucket in buckets]
+    assert list(resampled["Volume"]) == [bucket["Volume"].sum() for bucket in buckets]
+    assert list(resampled["Dividends"]) == [0.0, 0.5, 0.0]
+    assert list(resampled["SMA_3"]) == [3.0, 7.0, 9.0]
+    assert functions.resample_ohlc(df, max_points=10) is df
+
+
+def test_crossover_signals_survive_resampling():
+    df = ohlcv(12, start="2025-01-02 09:30", freq="min")
+    signals = np.full(12, np.nan)
+    signals[5], signals[10] = 1, -1
+    df["Crossover_50/200"] = signals
+    df["ΔVolume%"] = 0.0
+
+    resampled = functions.resample_ohlc(df, max_points=3)
+
+    assert list(resampled["Crossover_50/200"]) == [0.0, 1.0, -1.0]
+    volume = resampled["Volume"]
+    np.testing.assert_allclose(resampled["ΔVolume%"].iloc[1:], (volume.pct_change() * 100).round(2).iloc[1:])
+
+
+def test_lttb_keeps_the_ends_within_the_budget():
+    x = np.arange(1000)
+    y = np.sin(x / 50)
+    y[437] = 10  # a spike no line chart should lose
+
+    kept = functions.lttb(x, y, max_points=100)
+
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == 999
+    assert np.all(np.diff(kept) > 0)
+    assert 437 in kept
+    # Nothing to drop
+    assert list(functions.lttb(x[:50], y[:50], max_points=100)) == list(range(50))
+
+
+def test_slice_range_of_a_tz_aware_index():
+    df = ohlcv(60, start=pd.Timestamp("2025-01-02 09:30", tz="America/New_York"), freq="min")
+
+    # The chart reports its range in the exchange's local time
+    sliced = functions.slice_range(df, ("2025-01-02 09:40", "2025-01-02 09:49"))
+
+    assert len(sliced) == 10
+    assert sliced.index[0] == pd.Timestamp("2025-01-02 09:40", tz="America/New_York")
+    assert sliced.index[-1] == pd.Timestamp("2025-01-02 09:49", tz="America/New_York")
+    assert str(sliced.index.tz) == "America/New_York"
+    assert functions.slice_range(df) is df
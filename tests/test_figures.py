@@ -0,0 +1,57 @@
+import functions
+import metrics
+from cache import TTLCache, cached
+from synthetic import daily
+
+
+def plot(df, title=""):
+    plot.builds += 1
+    return functions.plot_line_multiple(df, title=title)
+
+
+plot.builds = 0
+
+
+def test_figures_follow_the_upstream_entry(source):
+    builds = plot.builds
+    frames = [daily("AAA", n=5000)[["Close"]]]
+
+    @cached(3600, cache=TTLCache())
+    def fetch(ticker):
+        return frames[-1]
+
+    data, version = fetch.versioned("AAA")
+    first = functions.cached_figure(plot, data, version=version, title="AAA")
+    data, again_version = fetch.versioned("AAA")
+    again = functions.cached_figure(plot, data, version=again_version, title="AAA")
+    assert again_version == version
+    assert plot.builds == builds + 1
+    assert again == first
+    # Plotly changes the trace dicts it is given, each render gets its own
+    assert again["data"][0] is not first["data"][0]
+
+    # A change in a single row in the middle of a long series
+    changed = frames[-1].copy()
+    changed.iloc[2501, 0] += 1
+    frames.append(changed)
+    fetch.refresh("AAA", min_age=0)
+    data, version = fetch.versioned("AAA")
+    second = functions.cached_figure(plot, data, version=version, title="AAA")
+    assert plot.builds == builds + 2
+    assert second["data"] != first["data"]
+
+
+def test_figure_size_is_recorded_on_every_render(source):
+    was_enabled = metrics.enabled()
+    metrics.enable()
+    metrics.reset()
+    try:
+        for _ in range(3):
+            fig = functions.cached_figure(plot, daily("AAA")[["Close"]], version=("AAA",))
+            functions.plotly_chart(fig, "line")
+        sizes = metrics.summary()[1]
+        assert sizes["figure.line"]["count"] == 3
+        assert sizes["figure.line"]["max"] == fig.nbytes
+    finally:
+        metrics.enable(was_enabled)
+        metrics.reset()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+import synthetic
+
+INDICATORS = ["SMA_20", "SMA_50", "EMA_20", "EMA_50", "MACD", "RSI", "ATR", "Crossover_20/50"]
+START = pd.Timestamp("2024-01-01", tz="UTC")
+
+
+def ohlcv(n, seed=0):
+    # Minute bars from START, so longer draws extend shorter ones
+    return synthetic.ohlcv(n, seed, start=START)
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    indicators.clear()
+    yield
+    indicators.clear()
+
+
+def assert_matches_full_recompute(incremental, df):
+    full = indicators.add_indicators(df, INDICATORS)  # no key, computed from scratch
+    assert list(incremental.columns) == list(full.columns)
+    for column in full.columns:
+        np.testing.assert_allclose(incremental[column], full[column], rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=column)
+
+
+def test_appended_bars():
+    df = ohlcv(1000)
+    indicators.add_indicators(df.iloc[:900], INDICATORS, key=("T", "1d", "1m"))
+    result = indicators.add_indicators(df, INDICATORS, key=("T", "1d", "1m"))
+    assert_matches_full_recompute(result, df)
+
+
+def test_rewritten_last_bar():
+    df = ohlcv(500)
+    indicators.add_indicators(df, INDICATORS, key=("T", "1d", "1m"))
+
+    # The last bar was still forming, it comes back with other prices
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.05
+    revised.iloc[-1, revised.columns.get_loc("High")] *= 1.06
+    revised = pd.concat([revised, ohlcv(510, seed=1).iloc[500:]])
+
+    result = indicators.add_indicators(revised, INDICATORS, key=("T", "1d", "1m"))
+    assert_matches_full_recompute(result, revised)
+
+
+def test_split_adjusted_prefix_falls_back_to_full_recompute():
+    df = ohlcv(500)
+    indicators.add_indicators(df, INDICATORS, key=("T", "1d", "1m"))
+
+    # A 2:1 split rewrites every earlier price
+    adjusted = df.copy()
+    adjusted[["Open", "High", "Low", "Close"]] /= 2
+    adjusted = pd.concat([adjusted, ohlcv(520, seed=2).iloc[500:]])
+
+    result = indicators.add_indicators(adjusted, INDICATORS, key=("T", "1d", "1m"))
+    assert_matches_full_recompute(result, adjusted)
+
+
+def test_atr_extended_before_its_first_value():
+    # No high/low on the first bars: the stored ATR ends in NaN and can't seed
+    df = ohlcv(60)
+    df.iloc[:10, [df.columns.get_loc("High"), df.columns.get_loc("Low")]] = np.nan
+    indicators.add_indicators(df.iloc[:8], ["ATR"], key=("T", "1d", "1m"))
+    result = indicators.add_indicators(df, ["ATR"], key=("T", "1d", "1m"))
+    expected = indicators.add_indicators(df, ["ATR"])
+    np.testing.assert_allclose(result["ATR"], expected["ATR"], equal_nan=True)
@@ -0,0 +1,112 @@
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+import functions
+from live import LiveFeed, RingBuffer, poll_interval
+from synthetic import daily
+
+
+@pytest.fixture
+def feeds():
+    # Feeds made by a test, stopped before the source fixture is undone
+    made = []
+
+    def make(source):
+        feed = LiveFeed(source)
+        made.append(feed)
+        return feed
+
+    yield make
+    for feed in made:
+        feed.stop()
+
+
+def minutes(start, closes):
+    index = pd.date_range(start, periods=len(closes), freq="min", tz="UTC")
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({"Open": closes, "High": closes + 1, "Low": closes - 1,
+                         "Close": closes, "Volume": 100.0}, index=index)
+
+
+def test_poll_interval_follows_the_bar():
+    assert poll_interval("1m") == 15
+    assert poll_interval("1h") == 900
+
+
+def test_feeds_share_one_poll_per_ticker(source, feeds):
+    # Two sessions' feeds reading the same ticker
+    for feed in (feeds(functions.fetch_latest_bars), feeds(functions.fetch_latest_bars)):
+        assert len(feed.subscribe("AAA", "1m")) > 0
+    assert source.calls[("history", "AAA")] == 1
+
+
+def test_only_due_tickers_are_polled(feeds):
+    polls = []
+
+    def fetch(ticker, interval):
+        polls.append(ticker)
+        return daily(ticker, n=5)
+
+    feed = feeds(fetch)
+    feed.subscribe("AAA", "1m")
+    assert feed.poll_all() == 0
+    assert feed.poll_all(now=time.monotonic() + poll_interval("1m")) == 1
+    assert polls == ["AAA", "AAA"]
+
+
+def test_stop_ends_the_poller(feeds):
+    feed = feeds(lambda ticker, interval: daily(ticker, n=5))
+    feed.subscribe("AAA", "1m")
+    thread = feed._thread
+    feed.stop()
+    assert not thread.is_alive()
+
+
+def test_ring_buffer_keeps_the_last_bars_at_capacity():
+    buffer = RingBuffer(capacity=3)
+    closes = np.arange(10, dtype=float)
+    for i in range(10):
+        buffer.push(minutes(pd.Timestamp("2025-01-02 15:00", tz="UTC") + pd.Timedelta(minutes=i), closes[i:i + 1]))
+        assert len(buffer) == min(i + 1, 3)
+
+    frame, _ = buffer.frame()
+    assert list(frame["Close"]) == [7.0, 8.0, 9.0]
+    assert frame.index.is_monotonic_increasing
+    # More bars than fit at once
+    buffer.push(minutes("2025-01-02 16:00", [20, 21, 22, 23, 24]))
+    assert list(buffer.frame()[0]["Close"]) == [22.0, 23.0, 24.0]
+
+
+def test_ring_buffer_replaces_the_last_bar():
+    buffer = RingBuffer(capacity=10)
+    buffer.push(minutes("2025-01-02 15:00", [1, 2, 3]))
+    version = buffer.version
+
+    # Polled again: older bars, the last one updated and a new one
+    added = buffer.push(minutes("2025-01-02 15:01", [2, 30, 4]))
+
+    frame, new_version = buffer.frame()
+    assert added == 1
+    assert list(frame["Close"]) == [1.0, 2.0, 30.0, 4.0]
+    assert new_version > version
+    # Only the bars from a timestamp on
+    since = pd.Timestamp("2025-01-02 15:02", tz="UTC").value
+    assert list(buffer.frame(since)[0]["Close"]) == [30.0, 4.0]
+
+
+def test_extend_live_candles_replaces_the_last_drawn_bar():
+    drawn = minutes("2025-01-02 15:00", [1, 2, 3])
+    fig = go.Figure(go.Candlestick(x=drawn.index, open=drawn["Open"], high=drawn["High"],
+                                   low=drawn["Low"], close=drawn["Close"]))
+
+    functions.extend_live_candles(fig, minutes("2025-01-02 15:02", [30, 4]), max_points=10)
+    assert list(fig.data[0].close) == [1, 2, 30, 4]
+    assert pd.Timestamp(fig.data[0].x[-1]) == pd.Timestamp("2025-01-02 15:03", tz="UTC")
+
+    # Only the last max_points are kept
+    functions.extend_live_candles(fig, minutes("2025-01-02 15:04", [5, 6]), max_points=3)
+    assert list(fig.data[0].close) == [4, 5, 6]
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+import portfolio
+import functions
+
+
+def test_fetch_portfolio_is_cached(source):
+    args = (["AAA", "BBB"],)
+    kwargs = dict(weights=[0.6, 0.4], benchmark="^GSPC", period="1y", interval="1d")
+
+    analytics = functions.fetch_portfolio(*args, **kwargs)
+    assert not isinstance(analytics, Exception)
+    assert list(analytics["summary"]["Weight"])[:2] == [0.6, 0.4]
+    calls = sum(source.calls.values())
+
+    assert not isinstance(functions.fetch_portfolio(*args, **kwargs), Exception)
+    assert sum(source.calls.values()) == calls
+
+
+def test_comparison_and_portfolio_share_the_batch_download(source):
+    tickers = ["AAA", "BBB"]
+    comparison = functions.fetch_comparison(tickers, period="1y", interval="1d")
+    assert list(comparison.columns) == tickers
+    functions.fetch_portfolio(tickers, benchmark=None, period="1y", interval="1d")
+    assert set(source.calls) == {("download", ("AAA", "BBB"))}
+
+    # The sidebar's batch adds the info, not another download
+    functions.fetch_batch(tickers, period="1y", interval="1d")
+    assert source.calls[("download", ("AAA", "BBB"))] == 1
+    assert source.calls[("info", "AAA")] == 1
+
+
+def price_matrix(n=120):
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0.0005, 0.01, (n, 3))
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    return pd.DataFrame(prices, columns=["A", "B", "C"],
+                        index=pd.bdate_range("2024-01-01", periods=n))
+
+
+def test_betas_match_covariance_over_variance():
+    prices = price_matrix()
+    returns = prices.pct_change().dropna()
+    bench = returns["C"] * 0.5 + returns["A"] * 0.5
+
+    expected = [returns[c].cov(bench) / bench.var() for c in returns.columns]
+    assert np.allclose(portfolio.betas(returns.to_numpy(), bench.to_numpy()), expected)
+    assert np.isnan(portfolio.betas(returns.to_numpy(), np.zeros(len(bench)))).all()
+
+
+def test_max_drawdowns_match_a_loop():
+    prices = np.array([[100, 10], [120, 9], [90, 8], [130, 12], [65, 11]], dtype=float)
+    expected = []
+    for column in prices.T:
+        peak, worst = column[0], 0.0
+        for price in column:
+            peak = max(peak, price)
+            worst = min(worst, price / peak - 1)
+        expected.append(worst)
+    assert np.allclose(portfolio.max_drawdowns(prices), expected)
+    assert np.allclose(expected, [-0.5, -0.2])
+
+
+def test_rolling_volatility_matches_pandas():
+    returns = price_matrix().pct_change().dropna()
+    expected = returns.rolling(21).std() * np.sqrt(252)
+    result = portfolio.rolling_volatility(returns.to_numpy(), window=21, annualization=252)
+    assert np.allclose(result, expected.to_numpy(), equal_nan=True)
+    assert np.isnan(portfolio.rolling_volatility(returns.to_numpy()[:5], window=21)).all()
+
+
+def test_portfolio_returns_are_rebalanced_to_the_weights():
+    prices = price_matrix()
+    analytics = portfolio.analyze(prices, weights=[2, 1, 1], benchmark=prices["C"])
+    returns = prices.pct_change().dropna()
+    weighted = returns["A"] * 0.5 + returns["B"] * 0.25 + returns["C"] * 0.25
+
+    equity = analytics["equity"]["Equity"].to_numpy()
+    assert np.allclose(equity, np.concatenate(([1.0], np.cumprod(1 + weighted.to_numpy()))))
+    summary = analytics["summary"]
+    assert np.allclose(summary["Weight"], [0.5, 0.25, 0.25, 1.0])
+    assert np.isclose(summary.loc["Portfolio", "Annual volatility"], weighted.std() * np.sqrt(252))
+    assert np.isclose(summary.loc["C", "Beta"], 1.0)
+    growth = (1 + weighted).prod()
+    assert np.isclose(summary.loc["Portfolio", "Annual return"], growth ** (252 / len(weighted)) - 1)
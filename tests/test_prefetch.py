@@ -0,0 +1,78 @@
+import datetime
+
+import functions
+from cache import market_cache
+from prefetch import Prefetcher, is_view_open, seconds_until_open
+
+
+def upstream_calls(source):
+    return sum(source.calls.values())
+
+
+def test_warmed_watchlist_serves_the_page(source):
+    view = functions.watchlist_view(["AAA", "BBB"], "3mo", "1d")
+    Prefetcher(functions.warm_view, defaults=[view]).run_pending()
+    warmed = upstream_calls(source)
+    assert warmed > 0
+
+    # What load_comparison and the portfolio's batch ask for
+    functions.fetch_comparison(["AAA", "BBB"], period="3mo", interval="1d")
+    functions.fetch_batch(["AAA", "BBB"], period="3mo", interval="1d")
+    assert upstream_calls(source) == warmed
+
+
+def test_warmed_security_serves_the_page(source):
+    functions.warm_view(functions.security_view("AAA"), market_open=False)
+    warmed = upstream_calls(source)
+
+    # What load_indices and load_security_info ask for
+    functions.fetch_info("AAA")
+    functions.fetch_snapshot(functions.snapshot_basket("AAA"))
+    assert upstream_calls(source) == warmed
+
+
+def test_most_requested_views_join_the_hot_set():
+    default = functions.security_view("AAA")
+    popular = functions.watchlist_view(["BBB", "CCC"], "1y", "1d")
+    prefetcher = Prefetcher(lambda view, market_open: None, defaults=[default], size=2)
+    prefetcher.record([popular, functions.security_view("DDD")])
+    prefetcher.record([popular])
+    assert prefetcher.hot_set() == [default, popular]
+
+
+def test_view_is_open_while_one_of_its_markets_is():
+    view = functions.watchlist_view(["TATAMOTORS.NS", "AAPL"], "1mo", "1d")
+    # Wednesday 10:00 in New York, India has closed
+    new_york = datetime.datetime(2025, 1, 8, 15, 0, tzinfo=datetime.timezone.utc)
+    assert is_view_open(view, new_york)
+    # Sunday
+    sunday = datetime.datetime(2025, 1, 5, 15, 0, tzinfo=datetime.timezone.utc)
+    assert not is_view_open(view, sunday)
+
+
+def test_seconds_until_open():
+    utc = datetime.timezone.utc
+    # Wednesday 10:00 in New York
+    assert seconds_until_open("AAPL", datetime.datetime(2025, 1, 8, 15, 0, tzinfo=utc)) == 0
+    # Wednesday 8:30 in New York, an hour before the open
+    assert seconds_until_open("AAPL", datetime.datetime(2025, 1, 8, 13, 30, tzinfo=utc)) == 3600
+    # Saturday noon in India, the market opens on Monday at 9:15
+    saturday = datetime.datetime(2025, 1, 11, 6, 30, tzinfo=utc)
+    assert seconds_until_open("TATAMOTORS.NS", saturday) == (2 * 24 - 2.75) * 3600
+
+
+def test_closed_markets_keep_the_snapshot(source, monkeypatch):
+    # Everything closed for the weekend
+    monkeypatch.setattr(functions, "seconds_until_open", lambda ticker: 2 * 24 * 3600)
+    tickers = functions.snapshot_basket("AAA")
+    functions.fetch_snapshot(tickers)
+    calls = upstream_calls(source)
+
+    functions.fetch_snapshot(tickers)
+    assert upstream_calls(source) == calls
+    key = ("fetch_snapshot", tuple(tickers), "1y", "1d")
+    assert market_cache.expires_in(key) > 24 * 3600
+
+    # One market open, quotes are kept for a minute only
+    monkeypatch.setattr(functions, "seconds_until_open", lambda ticker: 0 if ticker == "AAA" else 3600)
+    assert functions.snapshot_ttl(tickers) == functions.QUOTES_TTL
@@ -0,0 +1,149 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import functions
+import transport
+from proxies import ProxyPool, is_proxy_failure
+from synthetic import SyntheticSource
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    # A forward proxy answering every request itself
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def live_proxy():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ProxyHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dead_proxy():
+    # A port nothing listens on
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def pool(live_proxy, dead_proxy):
+    server, address = live_proxy
+    pool = ProxyPool(source=lambda: [address, dead_proxy], size=2,
+                     check_url="http://finance.example/", check_timeout=1)
+    pool.fill()
+    return pool
+
+
+def test_fill_admits_only_working_proxies(pool, live_proxy):
+    server, address = live_proxy
+    assert [p["address"] for p in pool.stats()] == [address]
+    assert server.requests == ["http://finance.example/"]
+
+
+def test_proxy_is_used_for_http_and_https(pool, live_proxy):
+    server, address = live_proxy
+    proxy = pool.acquire()
+    assert proxy.proxies == {"http": address, "https": address}
+
+    response = requests.get("http://finance.example/quote", proxies=proxy.proxies, timeout=1)
+    assert response.text == "ok"
+    assert server.requests[-1] == "http://finance.example/quote"
+
+
+def test_only_connection_failures_eject(pool, live_proxy):
+    _, address = live_proxy
+    pool.report(address, ok=True, latency=0.1)
+    assert len(pool) == 1
+    pool.report(address, ok=False)
+    assert len(pool) == 0 and pool.ejected == 1
+
+
+def test_is_proxy_failure():
+    assert is_proxy_failure(requests.exceptions.ProxyError())
+    assert is_proxy_failure(requests.exceptions.ConnectTimeout())
+    assert is_proxy_failure(ConnectionResetError())
+    assert not is_proxy_failure(ValueError("TICKER: no price data found"))
+    assert not is_proxy_failure(LookupError("No recording of info for TICKER"))
+
+
+class ProxiedSource(SyntheticSource):
+    uses_proxies = True
+
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+        self.proxies = []
+
+    def info(self, ticker, proxy=None):
+        self.proxies.append(proxy)
+        raise self.error
+
+
+@pytest.mark.parametrize("error, ejected", [
+    (ValueError("unknown ticker"), False),
+    (requests.exceptions.ProxyError("refused"), True),
+])
+def test_fetch_reports_proxy(source, pool, live_proxy, monkeypatch, error, ejected):
+    _, address = live_proxy
+    upstream = ProxiedSource(error)
+    monkeypatch.setattr(functions.sources, "current", lambda: upstream)
+    monkeypatch.setattr(functions, "proxy_pool", pool)
+    monkeypatch.setattr(functions.random, "random", lambda: 0.0)  # always through a proxy
+    monkeypatch.setattr(transport, "backoff", lambda attempt: 0)
+
+    result = functions.fetch_info("AAA")
+
+    assert isinstance(result, type(error))
+    assert upstream.proxies[0] == {"http": address, "https": address}
+    assert (len(pool) == 0) == ejected
+
+
+class DeadProxySource(SyntheticSource):
+    """Fails every call made through a proxy, answers direct ones."""
+
+    uses_proxies = True
+
+    def __init__(self):
+        super().__init__()
+        self.proxies = []
+
+    def info(self, ticker, proxy=None):
+        self.proxies.append(proxy)
+        if proxy is not None:
+            raise requests.exceptions.ProxyError("refused")
+        return super().info(ticker)
+
+
+def test_failed_proxy_is_ejected_and_the_call_made_directly(source, pool, live_proxy, monkeypatch):
+    _, address = live_proxy
+    upstream = DeadProxySource()
+    monkeypatch.setattr(functions.sources, "current", lambda: upstream)
+    monkeypatch.setattr(functions, "proxy_pool", pool)
+    monkeypatch.setattr(functions.random, "random", lambda: 0.0)  # always through a proxy
+    monkeypatch.setattr(transport, "backoff", lambda attempt: 0)
+
+    info = functions.fetch_info("AAA")
+
+    # Not retried through the dead proxy, and the direct answer is what's cached
+    assert upstream.proxies == [{"http": address, "https": address}, None]
+    assert len(pool) == 0
+    assert info["shortName"] == "AAA"
+    assert functions.fetch_info("AAA")["shortName"] == "AAA"
+    assert len(upstream.proxies) == 2
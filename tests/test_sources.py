@@ -0,0 +1,89 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from sources import RecordingSource, ReplaySource
+from synthetic import SyntheticSource
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """A directory with every kind of response recorded from a SyntheticSource."""
+    recorder = RecordingSource(SyntheticSource(), directory=str(tmp_path))
+    recorder.info("AAA")
+    recorder.history("AAA", period="1y")
+    recorder.download(["BBB", "CCC"], period="1y")
+    recorder.splits("AAA")
+    recorder.page("https://example.com/movers")
+    return str(tmp_path)
+
+
+def test_replay_serves_the_recording(recorded):
+    fake, replay = SyntheticSource(), ReplaySource(recorded)
+
+    assert replay.info("AAA") == fake.info("AAA")
+    pd.testing.assert_frame_equal(replay.history("AAA", period="3mo"),
+                                  fake.history("AAA", period="3mo"), check_freq=False)
+    pd.testing.assert_frame_equal(replay.download(["BBB", "CCC"], period="1y"),
+                                  fake.download(["BBB", "CCC"], period="1y"), check_freq=False)
+    assert replay.splits("AAA").empty
+    assert replay.page("https://example.com/movers") == fake.page("https://example.com/movers")
+    with pytest.raises(LookupError):
+        replay.info("ZZZ")
+
+
+def test_recording_leaves_no_temporary_files(tmp_path):
+    recorder = RecordingSource(SyntheticSource(), directory=str(tmp_path))
+    recorder.history("AAA", period="1mo")
+    # Merged with the bars already recorded
+    recorder.history("AAA", period="1y")
+
+    def fail(tmp):
+        with open(tmp, "w") as f:
+            f.write("{")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        recorder._write(str(tmp_path / "info" / "AAA.json"), fail)
+
+    names = [name for _, _, files in os.walk(tmp_path) for name in files]
+    assert names == ["AAA.parquet"]
+    assert len(ReplaySource(str(tmp_path)).history("AAA", period="1y")) == len(SyntheticSource().history("AAA", period="1y"))
+
+
+def test_replay_injects_latency(recorded):
+    replay = ReplaySource(recorded, latency=0.05, jitter=0.05, seed=1)
+    start = time.perf_counter()
+    for _ in range(3):
+        replay.info("AAA")
+    elapsed = time.perf_counter() - start
+    assert 0.15 <= elapsed < 0.5
+    assert replay.calls == 3
+
+
+def test_replay_injects_errors(recorded):
+    failing = ReplaySource(recorded, error_rate=1.0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        failing.history("AAA")
+    assert failing.errors == 1
+
+    flaky = ReplaySource(recorded, error_rate=0.5, seed=7)
+    failures = 0
+    for _ in range(200):
+        try:
+            flaky.info("AAA")
+        except requests.exceptions.ConnectionError:
+            failures += 1
+    assert failures == flaky.errors
+    assert 60 < failures < 140
+    # The same seed fails the same calls
+    again = ReplaySource(recorded, error_rate=0.5, seed=7)
+    for _ in range(200):
+        try:
+            again.info("AAA")
+        except requests.exceptions.ConnectionError:
+            pass
+    assert again.errors == failures
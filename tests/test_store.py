@@ -0,0 +1,105 @@
+import os
+import glob
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import store
+
+
+def bars(end, n):
+    index = pd.date_range(end=end, periods=n, freq="D", tz="UTC")
+    close = np.arange(n, dtype=float) + 100
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": np.arange(n)}, index=index)
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_covered_period_is_served_from_disk():
+    now = pd.Timestamp.now(tz="UTC").normalize()
+    calls = []
+
+    def download(period=None, start=None):
+        calls.append((period, start))
+        return bars(now, 400) if start is None else bars(now, 1)
+
+    first = store.load_history("AAA", "1y", "1d", download)
+    second = store.load_history("AAA", "3mo", "1d", download)
+
+    assert calls[0] == ("1y", None)
+    assert all(period is None for period, _ in calls[1:])  # only the new bars
+    assert second.index[0] >= first.index[0]
+    assert second.index[-1] == first.index[-1]
+
+
+def test_concurrent_refreshes_of_one_file():
+    now = pd.Timestamp.now(tz="UTC").normalize()
+    errors = []
+
+    def download(period=None, start=None):
+        return bars(now, 4000)
+
+    def load(period):
+        try:
+            for _ in range(5):
+                store.load_history("AAA", period, "1d", download)
+                store.write("AAA", "1d", bars(now, 4000), {"period": period, "start": None})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=load, args=(p,)) for p in ["1y", "2y", "5y", "max"] * 2]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    hist, meta = store.read("AAA", "1d")
+    assert len(hist) == 4000
+    assert glob.glob(os.path.join(store.STORE_DIR, "*", "*.tmp")) == []
+
+
+def intraday(end, n):
+    index = pd.date_range(end=end, periods=n, freq="min", tz="UTC")
+    close = np.arange(n, dtype=float) + 100
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": np.arange(n)}, index=index)
+
+
+def stale_store(days):
+    # 1m bars stored for "max" whose last bar is days old
+    end = pd.Timestamp.now(tz="UTC").floor("min") - pd.Timedelta(days=days)
+    store.write("AAA", "1m", intraday(end, 100), {"period": "max", "start": None, "updated": end.isoformat()})
+
+
+@pytest.mark.parametrize("days", [2, 45])
+def test_store_recovers_when_the_delta_cant_be_fetched(days):
+    stale_store(days)
+    now = pd.Timestamp.now(tz="UTC").floor("min")
+    calls = []
+
+    def download(period=None, start=None):
+        # Like Yahoo, 1m bars only go back 30 days, and this one fails deltas
+        calls.append((period, start))
+        if start is not None:
+            raise ValueError("1m data not available for startTime")
+        return intraday(now, 50)
+
+    first = store.load_history("AAA", "max", "1m", download)
+    assert first.index[-1] == now
+    assert calls[-1] == ("max", None)
+    if days > 30:
+        assert len(calls) == 1  # no delta asked for beyond the lookback
+
+    # The file was rewritten, the next load is served from it
+    calls.clear()
+    second = store.load_history("AAA", "max", "1m", download)
+    assert second.index[-1] == now
+    assert calls == []
@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+import requests
+
+import functions
+import transport
+from synthetic import SyntheticSource
+from symbols import SymbolMaster, read_listing, COLUMNS
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_readers_map_listings_to_yahoo_symbols(tmp_path):
+    nse = write(tmp_path / "EQUITY_L.csv",
+                "SYMBOL,NAME OF COMPANY, SERIES\nTATAMOTORS,Tata Motors Limited,EQ\n")
+    bse = write(tmp_path / "Equity.csv",
+                "Security Code,Security Id,Security Name,Status,Instrument\n"
+                "500570,TATAMOTORS,Tata Motors Ltd,Active,Equity\n"
+                "500001,OLD,Delisted Ltd,Delisted,Equity\n"
+                "700001,BOND,Some Bond,Active,Debentures\n")
+    nasdaq = write(tmp_path / "nasdaqlisted.txt",
+                   "Symbol|Security Name|Test Issue|ETF\nAAPL|Apple Inc.|N|N\nQQQ|Invesco QQQ|N|Y\n"
+                   "ZZZT|Test|Y|N\nFile Creation Time: 0101202500:00|||\n")
+    other = write(tmp_path / "otherlisted.txt",
+                  "ACT Symbol|Security Name|Exchange|Test Issue|ETF\nBRK.B|Berkshire Hathaway|N|N|N\n"
+                  "ABC$A|Preferred|N|N|N\n")
+    indices = write(tmp_path / "indices.csv", "symbol,name,exchange,quoteType\n^NSEI,NIFTY 50,NSI,INDEX\n")
+
+    assert read_listing(nse).to_dict("records") == [
+        {"symbol": "TATAMOTORS.NS", "name": "Tata Motors Limited", "exchange": "NSE", "quoteType": "EQUITY"}]
+    assert list(read_listing(bse)["symbol"]) == ["TATAMOTORS.BO"]
+    us = read_listing(nasdaq)
+    assert list(us["symbol"]) == ["AAPL", "QQQ"]
+    assert list(us["quoteType"]) == ["EQUITY", "ETF"]
+    other = read_listing(other)
+    assert list(other["symbol"]) == ["BRK-B"]
+    assert list(other["exchange"]) == ["NYSE"]
+    assert list(read_listing(indices).columns) == COLUMNS
+
+
+MASTER = SymbolMaster(pd.DataFrame(
+    [
+        ["TATAMOTORS.NS", "Tata Motors Limited", "NSE", "EQUITY"],
+        ["TATASTEEL.NS", "Tata Steel Limited", "NSE", "EQUITY"],
+        ["TCS.NS", "Tata Consultancy Services", "NSE", "EQUITY"],
+        ["INFY.NS", "Infosys Limited", "NSE", "EQUITY"],
+        ["^NSEI", "NIFTY 50", "NSI", "INDEX"],
+    ],
+    columns=COLUMNS,
+))
+
+
+def test_get_ignores_case():
+    assert MASTER.get("tatamotors.ns")["name"] == "Tata Motors Limited"
+    assert MASTER.get("^nsei")["quoteType"] == "INDEX"
+    assert MASTER.get("TATA") is None
+    assert "INFY.NS" in MASTER
+    assert len(MASTER) == 5
+
+
+def test_suggest_symbols_then_names():
+    assert [e["symbol"] for e in MASTER.suggest("tata")] == ["TATAMOTORS.NS", "TATASTEEL.NS", "TCS.NS"]
+    assert [e["symbol"] for e in MASTER.suggest("TATA", limit=2)] == ["TATAMOTORS.NS", "TATASTEEL.NS"]
+    assert [e["symbol"] for e in MASTER.suggest("infosys")] == ["INFY.NS"]
+    assert MASTER.suggest("  ") == []
+    assert MASTER.suggest("XYZ") == []
+
+
+class LookupSource(SyntheticSource):
+    """Knows AAA and BBB, fails the lookups of DOWN through a dead proxy.
+
+    peak is the largest number of calls in flight at once.
+    """
+
+    def __init__(self, delay=0.0):
+        super().__init__(delay=delay)
+        self.running = 0
+        self.peak = 0
+
+    def _call(self, method, key):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            super()._call(method, key)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def info(self, ticker, proxy=None):
+        if ticker == "DOWN":
+            self._call("info", ticker)
+            raise requests.exceptions.ProxyError("proxy unreachable")
+        if ticker not in ("AAA", "BBB"):
+            self._call("info", ticker)
+            return {"trailingPegRatio": None}
+        return super().info(ticker, proxy)
+
+
+@pytest.fixture
+def lookups(source, monkeypatch):
+    fake = LookupSource(delay=0.2)
+    previous = functions.sources.use(fake)
+    monkeypatch.setattr(functions, "symbol_master", lambda: MASTER)
+    monkeypatch.setattr(transport, "backoff", lambda attempt: 0)
+    yield fake
+    functions.sources.use(previous)
+
+
+def test_quote_types_only_look_up_unlisted_symbols_together(lookups):
+    types = functions.quote_types(["TATAMOTORS.NS", "AAA", "ZZZ", "DOWN", "^NSEI"])
+
+    assert types["TATAMOTORS.NS"] == "EQUITY"
+    assert types["^NSEI"] == "INDEX"
+    assert types["AAA"] == "EQUITY"
+    assert types["ZZZ"] is None  # unknown upstream
+    assert isinstance(types["DOWN"], requests.exceptions.ProxyError)  # not "not found"
+    assert not any(key[1] in ("TATAMOTORS.NS", "^NSEI") for key in lookups.calls)
+    # The three lookups overlap instead of running one after another
+    assert lookups.peak == 3
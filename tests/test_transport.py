@@ -0,0 +1,134 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import transport
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Answers with the scripted (status, headers) responses in turn, the last
+    # one repeated
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            status, headers = server.script[min(server.count, len(server.script) - 1)]
+            server.count += 1
+            server.times.append(time.monotonic())
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.script = [(200, {})]
+    server.count = 0
+    server.times = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session(monkeypatch):
+    # Short backoffs, so the retries don't slow the tests down
+    monkeypatch.setattr(transport, "BACKOFF_FACTOR", 0.01)
+    return transport.make_session()
+
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_port}/"
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retries_throttling_and_server_errors(stub, session, status):
+    stub.script = [(status, {}), (status, {}), (200, {})]
+    response = transport.get(url(stub), session=session)
+    assert response.status_code == 200
+    assert stub.count == 3
+
+
+def test_client_errors_are_not_retried(stub, session):
+    stub.script = [(404, {})]
+    with pytest.raises(requests.exceptions.HTTPError):
+        transport.get(url(stub), session=session)
+    assert stub.count == 1
+
+
+def test_honors_retry_after(stub, session):
+    stub.script = [(429, {"Retry-After": "1"}), (200, {})]
+    response = transport.get(url(stub), session=session)
+    assert response.status_code == 200
+    assert stub.times[1] - stub.times[0] >= 1
+
+
+def test_gives_up_after_the_attempt_limit(stub, session):
+    stub.script = [(503, {})]
+    with pytest.raises(requests.exceptions.RetryError):
+        transport.get(url(stub), session=session)
+    assert stub.count == transport.RETRIES + 1
+
+
+def test_call_retries_retryable_errors(monkeypatch):
+    monkeypatch.setattr(transport, "backoff", lambda attempt: 0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise requests.exceptions.ConnectionError("reset")
+        return "data"
+
+    assert transport.call("example.com", flaky) == "data"
+    assert len(attempts) == 3
+
+
+def test_call_gives_up_after_the_attempt_limit(monkeypatch):
+    monkeypatch.setattr(transport, "backoff", lambda attempt: 0)
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise Exception("429 Too Many Requests")
+
+    with pytest.raises(Exception, match="Too Many Requests"):
+        transport.call("example.com", throttled)
+    assert len(attempts) == transport.RETRIES + 1
+
+
+def test_call_does_not_retry_other_errors(monkeypatch):
+    monkeypatch.setattr(transport, "backoff", lambda attempt: 0)
+    attempts = []
+
+    def missing():
+        attempts.append(1)
+        raise ValueError("no price data found")
+
+    with pytest.raises(ValueError):
+        transport.call("example.com", missing)
+    assert len(attempts) == 1
+
+
+def test_call_retries_only_what_retryable_accepts(monkeypatch):
+    monkeypatch.setattr(transport, "backoff", lambda attempt: 0)
+    attempts = []
+
+    def refused():
+        attempts.append(1)
+        raise requests.exceptions.ProxyError("refused")
+
+    with pytest.raises(requests.exceptions.ProxyError):
+        transport.call("example.com", refused, retryable=lambda e: False)
+    assert len(attempts) == 1
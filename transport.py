@@ -0,0 +1,105 @@
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ---- HTTP TRANSPORT ----
+# Keep-alive sessions pooled per host, a bound on concurrent requests per host
+# and jittered exponential backoff on 429/5xx, shared by every fetcher.
+
+MAX_PER_HOST = 4  # concurrent requests (and pooled connections) per host
+RETRIES = 3
+BACKOFF_FACTOR = 0.5  # seconds, doubled on every retry
+BACKOFF_MAX = 8
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+TIMEOUT = 5
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+YAHOO_HOST = "finance.yahoo.com"
+
+_sessions = {}
+_slots = {}
+_lock = threading.Lock()
+
+
+def make_session():
+    """Keep-alive session retrying 429/5xx responses with jittered backoff."""
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_max=BACKOFF_MAX,
+        backoff_jitter=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_maxsize=MAX_PER_HOST, pool_block=True, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _host(url):
+    return urlsplit(url).netloc or url
+
+
+def session_for(url):
+    host = _host(url)
+    with _lock:
+        if host not in _sessions:
+            _sessions[host] = make_session()
+        return _sessions[host]
+
+
+def host_slot(url):
+    """Semaphore bounding the concurrent requests sent to a host."""
+    host = _host(url)
+    with _lock:
+        if host not in _slots:
+            _slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _slots[host]
+
+
+def backoff(attempt):
+    # Full jitter: anywhere between 0 and the exponential bound
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_FACTOR * 2 ** attempt))
+
+
+def is_retryable(exc):
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRY_STATUSES
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    message = str(exc)
+    return "Too Many Requests" in message or "Rate limit" in message or "429" in message
+
+
+def call(url, func, *args, retryable=is_retryable, **kwargs):
+    """Runs func inside the host's concurrency bound, retrying with backoff
+    the errors retryable(error) accepts.
+
+    Used for clients that manage their own connections, such as yfinance.
+    """
+    for attempt in range(RETRIES + 1):
+        try:
+            with host_slot(url):
+                return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == RETRIES or not retryable(e):
+                raise
+        time.sleep(backoff(attempt))
+
+
+def get(url, session=None, timeout=TIMEOUT):
+    """GETs url on the host's pooled session (or the one given)."""
+    session = session or session_for(url)
+    with host_slot(url):
+        response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
@@ -1,12 +1,11 @@
 from functions import *
-from contact import contact_form
-from streamlit_javascript import st_javascript
 from zoneinfo import ZoneInfo
-import yfinance as yf  # Import yfinance
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 @st.dialog("Contact Me")
 def show_contact_form():
+    from contact import contact_form  # imported when the dialog opens
     contact_form()
 
 
@@ -31,6 +30,8 @@ st.html(
 
 # --- TIME ZONE ---
 if "timezone" not in st.session_state:
+    # Only needed once per session
+    from streamlit_javascript import st_javascript
     timezone = st_javascript(
         """await (async () => {
                         const userTimezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
@@ -51,6 +52,8 @@ all_my_widget_keys_to_keep = {
     "dark_mode": False,
     "toggle_theme": False,
     "financial_period": "Annual",
+    "weights": "",
+    "benchmark": "^GSPC",
 }
 
 for key in all_my_widget_keys_to_keep:
@@ -61,6 +64,9 @@ for key in all_my_widget_keys_to_keep:
     st.session_state[key] = st.session_state[key]
 
 
+LIVE_INTERVALS = ["1m", "2m", "5m", "15m"]
+LIVE_REFRESH = 0.5  # seconds between live chart updates
+
 # --- SIDEBAR ---
 with st.sidebar:
     TOGGLE_THEME = st.toggle(
@@ -87,18 +93,23 @@ with st.sidebar:
         st.error("Only first 10 tickers are shown")
         TICKERS = TICKERS[:10]
 
+    # Listed symbols are validated locally, the others are looked up upstream together
     _tickers = list()
-    for TICKER in TICKERS:
-        info = fetch_info(TICKER)
-        if isinstance(info, Exception):
-            st.error(info)
-            fetch_info.clear(TICKER)
+    for TICKER, QUOTE_TYPE in quote_types(TICKERS).items():
+        if isinstance(QUOTE_TYPE, Exception):
+            st.error(QUOTE_TYPE)
+        elif QUOTE_TYPE is None:
+            suggestions = suggest_symbols(TICKER.split(".")[0], limit=5)
+            message = f"{TICKER} was not found"
+            if suggestions:
+                message += ". Did you mean: " + ", ".join(
+                    f"{s['symbol']} ({s['name']})" for s in suggestions
+                )
+            st.error(message)
+        elif QUOTE_TYPE not in ["EQUITY", "ETF", "INDEX"]:
+            st.error(f"{TICKER} has an invalid quoteType ({QUOTE_TYPE})")
         else:
-            QUOTE_TYPE = info.get("quoteType", "")
-            if QUOTE_TYPE not in ["EQUITY", "ETF", "INDEX"]:
-                st.error(f"{TICKER} has an invalid quoteType ({QUOTE_TYPE})")
-            else:
-                _tickers.append(TICKER)
+            _tickers.append(TICKER)
 
     TICKERS = _tickers
 
@@ -138,6 +149,38 @@ with st.sidebar:
         placeholder="Select interval...",
     )
 
+    # Live mode streams new bars into the charts without rerunning the page
+    LIVE = False
+    if INTERVAL in LIVE_INTERVALS and TICKERS:
+        LIVE = st.toggle(
+            label="Live :material/sensors:",
+            key="live",
+            help="Append new bars to the charts as they come in",
+        )
+
+    # Portfolio of the selected tickers, benchmarked against one of the indices
+    WEIGHTS = None
+    if len(TICKERS) > 1:
+        weights = st.text_input(
+            label="Portfolio weights:",
+            help="Comma-separated, in the order of the securities (equal weights if empty)",
+            key="weights",
+        )
+        try:
+            WEIGHTS = [float(w) for w in weights.split(",") if w.strip() != ""] or None
+            if WEIGHTS is not None and len(WEIGHTS) != len(TICKERS):
+                raise ValueError(f"Expected {len(TICKERS)} weights")
+        except ValueError as e:
+            st.error(f"Invalid weights, using equal weights ({e})")
+            WEIGHTS = None
+
+        BENCHMARK = st.selectbox(
+            label="Benchmark",
+            options=INDICES,
+            format_func=lambda index: INDICES_NAMES[INDICES.index(index)],
+            key="benchmark",
+        )
+
     if len(TICKERS) == 1:
 
         TOGGLE_VOL = st.toggle(label="Volume", value=True)
@@ -157,6 +200,19 @@ with st.sidebar:
             label="Technical indicators:", options=indicator_list
         )
 
+        BACKTEST = st.selectbox(
+            label="Backtest strategy",
+            options=["None", "SMA crossover", "RSI", "MACD"],
+            help="SMA 50/200 crossover, RSI 30/70 or MACD above its signal line",
+        )
+
+        SWEEP = False
+        if BACKTEST == "SMA crossover":
+            SWEEP = st.toggle(
+                label="Sweep SMA windows",
+                help="Backtest every pair of SMA windows from 10 to 200",
+            )
+
         if "SMA_X" in INDICATORS or "EMA_X" in INDICATORS:
             TIME_SPAN = st.slider(
                 label="Select time span:",
@@ -172,19 +228,22 @@ with st.sidebar:
             ]
 
     st.write("")
-    button = st.button("Refresh data")
+    # The cached data this page shows is dropped in main(), once all of its
+    # keys are known
+    REFRESH = st.button("Refresh data")
 
-    if button:
+    if REFRESH:
         st.session_state["current_time_price_page"] = datetime.datetime.now(
             st.session_state["timezone"]
         ).replace(microsecond=0, tzinfo=None)
-        fetch_table.clear()
-        fetch_info.clear()
-        fetch_history.clear()
-        # st.cache_data.clear()
 
     st.write("Last update:", st.session_state["current_time_price_page"])
 
+    # Timings, payload sizes and cache counters, recorded when METRICS=1 is set
+    DEBUG = False
+    if metrics.enabled():
+        DEBUG = st.toggle(label="Debug panel :material/bug_report:", key="debug")
+
     st.markdown("Made with ❤️ by Leonardo")
 
     button = st.button("✉️ Contact Me", key="contact")
@@ -208,35 +267,86 @@ with st.sidebar:
 # --- MAINPAGE ---
 st.title("Stock Market Dashboard")
 
-def display_indices():
-    """Displays the performance of key global indices."""
-    indices = ["^GSPC", "^DJI", "^IXIC", "^N225", "^GDAXI", "^NSEI"]  # Add NSEI
-    indices_names = [
-        "S&P 500",
-        "Dow Jones",
-        "NASDAQ",
-        "Nikkei 225",
-        "DAX",
-        "NIFTY 50",
-    ]
+@st.fragment(run_every=LIVE_REFRESH)
+@timed()
+def display_live(tickers, interval):
+    """Displays live candlestick charts, appending only the new bars on each update."""
+    st.subheader("🔴 Live")
+
+    charts = st.session_state.setdefault("live_charts", {})
+    for key in [key for key in charts if key[0] not in tickers or key[1] != interval]:
+        del charts[key]
+
+    columns = st.columns(2)
+    for i, ticker in enumerate(tickers):
+        buffer = live_feed.subscribe(ticker, interval)
+        chart = charts.get((ticker, interval))
+
+        if chart is None:
+            bars, version = buffer.frame()
+            chart = {"fig": plot_live_candles(bars, title=ticker), "version": version, "last": None}
+            charts[(ticker, interval)] = chart
+        elif buffer.version != chart["version"]:
+            # Only the bars from the last one drawn on are sent to the figure
+            bars, version = buffer.frame(since=chart["last"])
+            extend_live_candles(chart["fig"], bars)
+            chart["version"] = version
+        else:
+            bars = None
 
+        if bars is not None and not bars.empty:
+            chart["last"] = bars.index[-1].value
+
+        with columns[i % 2]:
+            plotly_chart(chart["fig"], "live", use_container_width=True, key=f"live_{ticker}")
+
+
+TOP_MOVERS_URLS = {
+    "NSE": (
+        "https://www.nseindia.com/live_market/dynaContent/live_analysis/nifty_top_gainers.htm",
+        "https://www.nseindia.com/live_market/dynaContent/live_analysis/nifty_top_losers.htm",
+    ),
+    "BSE": (
+        "https://www.bseindia.com/markets/equity/EQReports/topGainers.aspx",
+        "https://www.bseindia.com/markets/equity/EQReports/topLosers.aspx",
+    ),
+}
+
+# The load_* functions only gather data (they run on worker threads and must
+# not call Streamlit), the display_* functions render it on the script thread.
+# Failures are returned as exceptions, like the fetchers do.
+
+@timed()
+def load_indices(snapshot_tickers):
+    """Fetches the last price and change of the key global indices."""
     try:
-        indices_data = yf.download(indices, period="2d")  # Need 2 days to get change
-        if not indices_data.empty:
+        snapshot = fetch_snapshot(snapshot_tickers)
+        if isinstance(snapshot, Exception):
+            return snapshot
+        return quotes(snapshot, INDICES)
+    except Exception as e:
+        return e
+
+@timed()
+def display_indices(indices_quotes):
+    """Displays the performance of key global indices."""
+    try:
+        if isinstance(indices_quotes, Exception):
+            raise indices_quotes
+        if not indices_quotes.empty:
             st.subheader("📊 Major Global Indices")
-            latest_prices = indices_data["Close"].iloc[-1]
-            previous_closes = indices_data["Close"].iloc[-2]
-            changes = latest_prices - previous_closes
-            percent_changes = (changes / previous_closes) * 100
 
             index_data = []
-            for i, index in enumerate(indices):
+            for i, index in enumerate(INDICES):
+                if index not in indices_quotes.index:
+                    continue
+                quote = indices_quotes.loc[index]
                 index_data.append(
                     {
-                        "Index": indices_names[i],
-                        "Price": f"{latest_prices[index]:.2f}",
-                        "Change": f"{changes[index]:+.2f}",
-                        "Change (%)": f"{percent_changes[index]:+.2f}%",
+                        "Index": INDICES_NAMES[i],
+                        "Price": f"{quote['Price']:.2f}",
+                        "Change": f"{quote['Change']:+.2f}",
+                        "Change (%)": f"{quote['Change (%)']:+.2f}%",
                     }
                 )
 
@@ -247,22 +357,27 @@ def display_indices():
     except Exception as e:
         st.error(f"Error fetching indices: {e}")
 
-def display_top_movers(exchange="NSE"):
+@timed()
+def load_top_movers(exchange="NSE"):
+    """Fetches the gainers and losers tables of an exchange (both pages at once)."""
+    if exchange not in TOP_MOVERS_URLS:
+        return ValueError("Invalid exchange.  Choose NSE or BSE.")
+    gainers_url, losers_url = TOP_MOVERS_URLS[exchange]
+    tables = fetch_tables([gainers_url, losers_url])
+    return tables[gainers_url], tables[losers_url]
+
+@timed()
+def display_top_movers(tables, exchange="NSE"):
     """Displays the top 5 gainers and losers on the specified exchange."""
     try:
-        if exchange == "NSE":
-            gainers_url = "https://www.nseindia.com/live_market/dynaContent/live_analysis/nifty_top_gainers.htm"
-            losers_url = "https://www.nseindia.com/live_market/dynaContent/live_analysis/nifty_top_losers.htm"
-        elif exchange == "BSE":
-            gainers_url = "https://www.bseindia.com/markets/equity/EQReports/topGainers.aspx"
-            losers_url = "https://www.bseindia.com/markets/equity/EQReports/topLosers.aspx"
-        else:
-            st.error("Invalid exchange.  Choose NSE or BSE.")
-            return
+        if isinstance(tables, Exception):
+            raise tables
 
-        # Fetch the tables
-        gainers_df = fetch_table(gainers_url, 0)  # NSE and BSE gainers table is the first table
-        losers_df = fetch_table(losers_url, 0)  # NSE and BSE losers table is the first table
+        # NSE and BSE tables are the first table of the page
+        gainers_df, losers_df = tables
+        for df in [gainers_df, losers_df]:
+            if isinstance(df, Exception):
+                raise df
 
         if not gainers_df.empty:
             if exchange == "NSE":
@@ -306,27 +421,171 @@ def display_top_movers(exchange="NSE"):
 
 
 
-def display_security_info(ticker_symbol="TATAMOTORS.NS"):
+@timed()
+def load_comparison(tickers, period, interval):
+    """Fetches the aligned percent-change matrix of the selected tickers, and its version."""
+    return fetch_comparison.versioned(tickers, period=period, interval=interval)
+
+@timed()
+def display_comparison(data):
+    """Displays a gauge per ticker and their percent changes on one chart."""
+    try:
+        pct, version = data
+        if isinstance(pct, Exception):
+            raise pct
+        if pct.empty:
+            st.warning("No common price history for the selected securities.")
+            return
+
+        st.subheader("📈 Comparison")
+        columns = st.columns(min(len(pct.columns), 5))
+        for i, ticker in enumerate(pct.columns):
+            with columns[i % len(columns)]:
+                fig = cached_figure(plot_gauge, pct, ticker, version=version)
+                plotly_chart(fig, "gauge", use_container_width=True)
+
+        fig = cached_figure(plot_line_multiple, pct, version=version,
+                            title=f"Percentage change ({PERIOD}, {INTERVAL})")
+        plotly_chart(fig, "line_multiple", use_container_width=True)
+    except Exception as e:
+        st.error(f"Error comparing securities: {e}")
+
+@timed()
+def load_portfolio(tickers, weights, benchmark, period, interval):
+    """Fetches the portfolio analytics of the selected tickers, and their version."""
+    return fetch_portfolio.versioned(tickers, weights=weights, benchmark=benchmark,
+                                     period=period, interval=interval)
+
+@timed()
+def display_portfolio(data, benchmark):
+    """Displays the portfolio summary, the correlation matrix and the equity curve."""
+    try:
+        analytics, version = data
+        if isinstance(analytics, Exception):
+            raise analytics
+
+        st.subheader("💼 Portfolio")
+        summary = analytics["summary"]
+        st.dataframe(
+            summary.style.format("{:.2%}", subset=[c for c in summary.columns if c != "Beta"])
+            .format("{:.2f}", subset=[c for c in summary.columns if c == "Beta"]),
+            use_container_width=True,
+        )
+        st.caption(f"Beta against the {INDICES_NAMES[INDICES.index(benchmark)]}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            fig = cached_figure(plot_equity, analytics["equity"], version=version,
+                                title=f"Portfolio value ({PERIOD}, {INTERVAL})")
+            plotly_chart(fig, "equity", use_container_width=True)
+        with col2:
+            fig = cached_figure(plot_correlation, analytics["correlation"], version=version,
+                                title="Correlation of returns")
+            plotly_chart(fig, "correlation", use_container_width=True)
+    except Exception as e:
+        st.error(f"Error computing portfolio analytics: {e}")
+
+@timed()
+def load_backtest(ticker, strategy, sweep, period, interval):
+    """Fetches the backtest of a strategy, and the SMA window sweep if asked for,
+    each with its version."""
+    result = fetch_backtest.versioned(ticker, strategy, period=period, interval=interval)
+    return result, fetch_sweep.versioned(ticker, period=period, interval=interval) if sweep else (None, None)
+
+@timed()
+def display_backtest(data, strategy):
+    """Displays the equity curves and summary statistics of a backtest."""
+    try:
+        (result, version), (sweep, sweep_version) = data
+        if isinstance(result, Exception):
+            raise result
+
+        st.subheader(f"🧪 Backtest: {strategy}")
+        stats = result["stats"]
+        st.dataframe(
+            stats.style.format("{:.2%}", subset=[c for c in stats.columns if c not in ["Sharpe", "Trades"]])
+            .format("{:.2f}", subset=["Sharpe"]),
+            use_container_width=True,
+        )
+        fig = cached_figure(plot_line_multiple, result["equity"] - 1, version=version,
+                            title=f"Equity ({PERIOD}, {INTERVAL})")
+        plotly_chart(fig, "line_multiple", use_container_width=True)
+
+        if sweep is not None:
+            if isinstance(sweep, Exception):
+                raise sweep
+            fig = cached_figure(plot_sweep, sweep, version=sweep_version, title="Sharpe ratio by SMA windows")
+            plotly_chart(fig, "sweep", use_container_width=True)
+            st.dataframe(
+                sweep.head(10).style.format("{:.2%}", subset=["Total return", "Annual return", "Max drawdown"])
+                .format("{:.2f}", subset=["Sharpe"]),
+                use_container_width=True,
+            )
+    except Exception as e:
+        st.error(f"Error running the backtest: {e}")
+
+@timed()
+def load_security_info(snapshot_tickers, ticker_symbol="TATAMOTORS.NS"):
+    """Fetches the info and 1-year history of a security, and the history's version."""
+    try:
+        info = fetch_info(ticker_symbol)
+        if isinstance(info, Exception):
+            return info
+        if not info:
+            return info, None, None
+        # Downloaded together with the indices
+        snapshot, version = fetch_snapshot.versioned(snapshot_tickers)
+        if isinstance(snapshot, Exception):
+            return snapshot
+        bars = snapshot[ticker_symbol]
+        if isinstance(bars, Exception):
+            return bars
+        return info, bars.to_frame(), version  # Example: 1-year history
+    except Exception as e:
+        return e
+
+@timed()
+def display_security_info(data, ticker_symbol="TATAMOTORS.NS", indicators=(), show_volume=True):
     """Displays detailed information and a candlestick chart for a given security."""
     try:
-        security = yf.Ticker(ticker_symbol)
-        info = security.info
+        if isinstance(data, Exception):
+            raise data
+        info, security_history, version = data
         if info:
             st.subheader(f"Security: {info['shortName']}")
             security_info_df = info_table(info)
             st.dataframe(security_info_df, use_container_width=True)
 
-            # Fetch and display the price chart
-            security_history = security.history(
-                period="1y"
-            )  # Example: 1-year history
+            # Display the price chart
             if not security_history.empty:
-                fig = plot_candles_stick_bar(
-                    security_history,
+                security_history = add_indicators(
+                    security_history, indicators, key=(ticker_symbol, "1y", "1d")
+                )
+                if not show_volume:
+                    security_history = security_history.drop(columns="Volume")
+
+                # Zooming rebuilds the figure from the bars in range, so the
+                # number of points sent to the browser stays bounded
+                index = security_history.index.tz_localize(None)
+                first, last = index[0].to_pydatetime(), index[-1].to_pydatetime()
+                x_range = st.slider(
+                    label="Zoom",
+                    min_value=first,
+                    max_value=last,
+                    value=(first, last),
+                    format="YYYY-MM-DD",
+                    key=f"zoom_{ticker_symbol}",
+                )
+
+                # The chart is derived from the snapshot's bars by the
+                # indicators, the volume toggle and the zoom
+                fig = cached_figure(
+                    plot_candles_stick_bar, slice_range(security_history, x_range),
+                    version=(version, tuple(indicators), show_volume, x_range),
                     title=f"{info['shortName']} - 1 Year",
                     currency=info.get("currency", "INR"),
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, "candles_stick_bar", use_container_width=True)
             else:
                 st.warning(
                     f"Could not retrieve historical data for {ticker_symbol} for the chart."
@@ -338,16 +597,132 @@ def display_security_info(ticker_symbol="TATAMOTORS.NS"):
 
 
 
+def display_debug():
+    """Displays the recorded timings, payload sizes and cache counters."""
+    st.subheader("🐞 Debug")
+    durations, sizes = metrics.summary()
+
+    if durations:
+        df = pd.DataFrame.from_dict(durations, orient="index")
+        ms = [c for c in df.columns if c != "count"]
+        df[ms] = df[ms] * 1000
+        st.caption("Durations (ms)")
+        st.dataframe(df.sort_values("total", ascending=False).round(2), use_container_width=True)
+
+    if sizes:
+        df = pd.DataFrame.from_dict(sizes, orient="index")
+        kb = [c for c in df.columns if c != "count"]
+        df[kb] = df[kb] / 1024
+        st.caption("Payload sizes (KB)")
+        st.dataframe(df.round(1), use_container_width=True)
+
+    st.caption("Cache")
+    st.dataframe(pd.DataFrame.from_dict(metrics.cache_summary(), orient="index"), use_container_width=True)
+
+    st.download_button(
+        label="Prometheus metrics",
+        data=metrics.export(),
+        file_name="metrics.prom",
+        mime="text/plain",
+    )
+
+def refresh_data(snapshot_tickers, security_ticker):
+    """Drops the cached data the page is about to show, so it is fetched again.
+
+    Only the calls this page makes are refreshed, other sessions' entries are
+    left alone. Entries younger than a minute are kept, so repeated presses
+    can't force everything to be downloaded again.
+    """
+    fetch_snapshot.refresh(snapshot_tickers)
+    fetch_info.refresh(security_ticker)
+    for urls in TOP_MOVERS_URLS.values():
+        for url in urls:
+            fetch_table.refresh(url)
+
+    if len(TICKERS) > 1:
+        # The derived results first, so none is rebuilt from stale histories
+        fetch_comparison.refresh(TICKERS, period=PERIOD, interval=INTERVAL)
+        fetch_portfolio.refresh(TICKERS, weights=WEIGHTS, benchmark=BENCHMARK,
+                                period=PERIOD, interval=INTERVAL)
+        fetch_batch.refresh(TICKERS, period=PERIOD, interval=INTERVAL)
+        fetch_histories.refresh(TICKERS, period=PERIOD, interval=INTERVAL)
+        fetch_bars.refresh(BENCHMARK, period=PERIOD, interval=INTERVAL)
+
+    if len(TICKERS) == 1 and BACKTEST != "None":
+        fetch_backtest.refresh(TICKERS[0], BACKTEST, period=PERIOD, interval=INTERVAL)
+        fetch_sweep.refresh(TICKERS[0], period=PERIOD, interval=INTERVAL)
+        fetch_bars.refresh(TICKERS[0], period=PERIOD, interval=INTERVAL)
+
 # --- Main function to run the app ---
+@timed("page")
 def main():
     """Main function to run the Streamlit application."""
-    display_indices()
-    display_top_movers("NSE")  # Display NSE top movers
-    display_top_movers("BSE")  # Display BSE Top movers
-    display_security_info()  # Defaults to TATAMOTORS.NS
+    if LIVE:
+        display_live(TICKERS, INTERVAL)
+
+    if len(TICKERS) == 1:
+        security = dict(ticker_symbol=TICKERS[0], indicators=INDICATORS, show_volume=TOGGLE_VOL)
+    else:
+        security = dict(ticker_symbol=DEFAULT_SECURITY)  # Defaults to TATAMOTORS.NS
+
+    # The indices and the security are downloaded together, every section
+    # reads cached data so reruns from widget changes don't go upstream
+    snapshot_tickers = snapshot_basket(security["ticker_symbol"])
+
+    if REFRESH:
+        refresh_data(snapshot_tickers, security["ticker_symbol"])
+
+    # The sections shown join the hot set kept warm in the background
+    views = [security_view(security["ticker_symbol"])]
+    if len(TICKERS) > 1:
+        views.append(watchlist_view(TICKERS, PERIOD, INTERVAL))
+    prefetcher.record(views)
+    prefetcher.start()
+
+    # (loader, its arguments, renderer, renderer keyword arguments) in page order
+    sections = [
+        (load_indices, (snapshot_tickers,), display_indices, {}),
+        (load_top_movers, ("NSE",), display_top_movers, {"exchange": "NSE"}),
+        (load_top_movers, ("BSE",), display_top_movers, {"exchange": "BSE"}),
+        (
+            load_security_info, (snapshot_tickers, security["ticker_symbol"]),
+            display_security_info, security,
+        ),
+    ]
+    if len(TICKERS) == 1 and BACKTEST != "None":
+        sections.append((
+            load_backtest, (TICKERS[0], BACKTEST, SWEEP, PERIOD, INTERVAL),
+            display_backtest, {"strategy": BACKTEST},
+        ))
+    if len(TICKERS) > 1:
+        sections.insert(-1, (load_comparison, (TICKERS, PERIOD, INTERVAL), display_comparison, {}))
+        sections.insert(-1, (
+            load_portfolio, (TICKERS, WEIGHTS, BENCHMARK, PERIOD, INTERVAL),
+            display_portfolio, {"benchmark": BENCHMARK},
+        ))
+
+    # One placeholder per section so the page keeps its order while sections
+    # are filled in as their data arrives
+    placeholders = []
+    for _ in sections:
+        placeholder = st.empty()
+        placeholder.caption("Loading...")
+        placeholders.append(placeholder)
+
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        futures = {
+            executor.submit(load, *args): i
+            for i, (load, args, _, _) in enumerate(sections)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            _, _, display, kwargs = sections[i]
+            with placeholders[i].container():
+                display(future.result(), **kwargs)
+
+    if DEBUG:
+        display_debug()
 
 
 if __name__ == "__main__":
     main()
-
-